@@ -0,0 +1,188 @@
+# imports necessários
+import operator
+import numpy as np
+
+# quantidade de bits 1 de cada valor de byte (0 a 255)
+_UNS_POR_BYTE = np.array([bin(valor).count('1') for valor in range(256)], dtype=np.int64)
+
+class BitBuffer:
+    """
+    Sequência de bits compactada: 8 bits por byte, o primeiro bit no bit mais significativo do primeiro byte
+    (os bits que sobram no último byte são sempre 0). Aceita os usos de uma list[int] de bits (len, índice,
+    fatia, + com listas, iteração e ==) e converte de/para bytes, inteiros e np.ndarray sem passar por listas.
+    """
+    __slots__ = ('_dados', '_tamanho')
+
+    # bits pode ser outra BitBuffer, uma sequência de 0 e 1 (lista, tupla, np.ndarray, iterável) ou um texto '0101'
+    def __init__(self, bits=()):
+        if isinstance(bits, BitBuffer):
+            self._dados = bytearray(bits._dados)
+            self._tamanho = bits._tamanho
+            return
+
+        if isinstance(bits, str):
+            if bits.strip('01'):
+                raise ValueError(f"Texto de bits inválido: {bits!r}")
+            copia = BitBuffer.de_inteiro(int(bits, 2) if bits else 0, len(bits))
+            self._dados, self._tamanho = copia._dados, copia._tamanho
+            return
+
+        if not isinstance(bits, (list, tuple, np.ndarray)):
+            bits = list(bits)
+        vetor = np.asarray(bits)
+        if vetor.ndim != 1:
+            raise ValueError(f"BitBuffer precisa de uma sequência de bits (recebido com {vetor.ndim} dimensões)")
+        self._dados = bytearray(np.packbits(vetor != 0).tobytes())
+        self._tamanho = len(vetor)
+
+    # cria a BitBuffer direto sobre um bytearray já compactado (sem cópia)
+    @classmethod
+    def _sobre(cls, dados: bytearray, tamanho: int) -> 'BitBuffer':
+        buffer = cls.__new__(cls)
+        buffer._dados = dados
+        buffer._tamanho = tamanho
+        return buffer
+
+    # recebe bytes (8 bits cada, MSB primeiro) e, opcionalmente, quantos desses bits são válidos
+    @classmethod
+    def de_bytes(cls, dados: bytes, tamanho: int = None) -> 'BitBuffer':
+        if tamanho is None:
+            tamanho = 8 * len(dados)
+        if not 0 <= tamanho <= 8 * len(dados):
+            raise ValueError(f"{len(dados)} bytes não têm {tamanho} bits")
+        dados = bytearray(dados[:(tamanho + 7) // 8])
+        _zerar_sobra(dados, tamanho)
+        return cls._sobre(dados, tamanho)
+
+    # recebe um inteiro não negativo e o número de bits (o valor ocupa os bits menos significativos)
+    @classmethod
+    def de_inteiro(cls, valor: int, tamanho: int) -> 'BitBuffer':
+        if valor < 0 or valor.bit_length() > tamanho:
+            raise ValueError(f"O valor {valor} não cabe em {tamanho} bits")
+        n_bytes = (tamanho + 7) // 8
+        return cls._sobre(bytearray((valor << (8 * n_bytes - tamanho)).to_bytes(n_bytes, 'big')), tamanho)
+
+    ############################################ Conversões ############################################
+
+    # bytes com todos os bits (o último byte é completado com zeros à direita)
+    def para_bytes(self) -> bytes:
+        return bytes(self._dados)
+
+    # os mesmos bytes sem cópia (somente leitura), para somas e buscas direto sobre o buffer
+    def visao_bytes(self) -> memoryview:
+        return memoryview(self._dados).toreadonly()
+
+    # valor inteiro dos bits, o primeiro bit é o mais significativo
+    def para_inteiro(self) -> int:
+        return int.from_bytes(self._dados, 'big') >> (8 * len(self._dados) - self._tamanho)
+
+    # vetor de bits (um elemento por bit)
+    def para_array(self, dtype=np.int8) -> np.ndarray:
+        bits = np.unpackbits(np.frombuffer(self._dados, dtype=np.uint8), count=self._tamanho)
+        return bits.astype(dtype, copy=False)
+
+    # permite np.asarray(buffer), usado pela camada física
+    def __array__(self, dtype=None, copy=None):
+        return self.para_array() if dtype is None else self.para_array(dtype)
+
+    # lista de bits (compatibilidade com a API de listas)
+    def tolist(self) -> list[int]:
+        return self.para_array().tolist()
+
+    ############################################ Sequência ############################################
+
+    def __len__(self) -> int:
+        return self._tamanho
+
+    def __iter__(self):
+        return iter(self.tolist())
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            inicio, fim, passo = indice.indices(self._tamanho)
+            if passo == 1:
+                return self._fatia(inicio, fim)
+            return BitBuffer(self.para_array()[indice])
+
+        i = self._posicao(indice)
+        return (self._dados[i >> 3] >> (7 - (i & 7))) & 1
+
+    # muda um único bit (como em uma lista: buffer[i] = 1, buffer[i] ^= 1)
+    def __setitem__(self, indice, bit):
+        if isinstance(indice, slice):
+            raise TypeError("BitBuffer só aceita atribuição de um bit por vez")
+        i = self._posicao(indice)
+        mascara = 0x80 >> (i & 7)
+        if bit:
+            self._dados[i >> 3] |= mascara
+        else:
+            self._dados[i >> 3] &= ~mascara & 0xFF
+
+    # converte um índice (inclusive negativo) na posição do bit
+    def _posicao(self, indice) -> int:
+        i = operator.index(indice)
+        if i < 0:
+            i += self._tamanho
+        if not 0 <= i < self._tamanho:
+            raise IndexError("índice fora da BitBuffer")
+        return i
+
+    # bits inicio .. fim - 1: cópia de bytes quando o início é múltiplo de 8, deslocamento de inteiro nos demais
+    def _fatia(self, inicio: int, fim: int) -> 'BitBuffer':
+        tamanho = max(0, fim - inicio)
+        if tamanho == 0:
+            return BitBuffer._sobre(bytearray(), 0)
+        if inicio % 8 == 0:
+            dados = self._dados[inicio // 8:(fim + 7) // 8]
+            _zerar_sobra(dados, tamanho)
+            return BitBuffer._sobre(dados, tamanho)
+
+        primeiro_byte, ultimo_byte = inicio // 8, (fim + 7) // 8
+        valor = int.from_bytes(self._dados[primeiro_byte:ultimo_byte], 'big')
+        valor >>= 8 * ultimo_byte - fim
+        return BitBuffer.de_inteiro(valor & ((1 << tamanho) - 1), tamanho)
+
+    ############################################ Operações ############################################
+
+    # concatenação: buffer + buffer, buffer + lista e lista + buffer devolvem BitBuffer
+    def __add__(self, outro):
+        if not isinstance(outro, (BitBuffer, list, tuple, np.ndarray)):
+            return NotImplemented
+        if not isinstance(outro, BitBuffer):
+            outro = BitBuffer(outro)
+        tamanho = self._tamanho + outro._tamanho
+        if self._tamanho % 8 == 0:
+            return BitBuffer._sobre(self._dados + outro._dados, tamanho)
+        return BitBuffer.de_inteiro((self.para_inteiro() << outro._tamanho) | outro.para_inteiro(), tamanho)
+
+    def __radd__(self, outro):
+        if not isinstance(outro, (list, tuple, np.ndarray)):
+            return NotImplemented
+        return BitBuffer(outro) + self
+
+    # igual a outra BitBuffer com os mesmos bits ou a uma sequência com os mesmos valores
+    def __eq__(self, outro):
+        if isinstance(outro, BitBuffer):
+            return self._tamanho == outro._tamanho and self._dados == outro._dados
+        if isinstance(outro, (list, tuple, np.ndarray)):
+            return len(outro) == self._tamanho and self.tolist() == list(outro)
+        return NotImplemented
+
+    __hash__ = None  # mutável, como uma lista
+
+    # quantidade de bits 1 (popcount), sem desempacotar os bits
+    def contar_uns(self) -> int:
+        return int(_UNS_POR_BYTE[np.frombuffer(self._dados, dtype=np.uint8)].sum())
+
+    def __repr__(self):
+        return f"BitBuffer('{format(self.para_inteiro(), f'0{self._tamanho}b') if self._tamanho else ''}')"
+
+# Zera os bits depois de tamanho no último byte (mantém a representação única)
+def _zerar_sobra(dados: bytearray, tamanho: int):
+    sobra = tamanho % 8
+    if sobra and dados:
+        dados[-1] &= (0xFF << (8 - sobra)) & 0xFF
+
+# recebe uma BitBuffer ou uma sequência de bits e retorna uma BitBuffer (sem copiar se já for uma)
+def como_buffer(bits) -> BitBuffer:
+    return bits if isinstance(bits, BitBuffer) else BitBuffer(bits)
@@ -1,13 +1,28 @@
+import struct
+import zlib
+import numpy as np
 import camada_fisica
+from buffer_bits import BitBuffer, como_buffer
 
 # Vamos assumir que trabalharemos sempre com blocos de 8 bits (Bytes) para os métodos baseados em byte.
 # Definições para Byte Stuffing
 FLAG_BYTE = [0, 1, 1, 1, 1, 1, 1, 0] # Representação do caractere '~' ou similar
 ESC_BYTE  = [0, 0, 0, 1, 1, 0, 1, 1] # Representação do caractere de escape (ESC)
 
+# Os mesmos bytes como valores inteiros, para comparar direto com os bytes de uma BitBuffer
+_FLAG = BitBuffer(FLAG_BYTE).para_inteiro() # 0x7E
+_ESC  = BitBuffer(ESC_BYTE).para_inteiro()  # 0x1B
+
 # Definições para Bit Stuffing
 FLAG_BIT  = [0, 1, 1, 1, 1, 1, 1, 0] # 0x7E
 
+# Todas as funções abaixo aceitam os bits como BitBuffer (compactados) ou list[int].
+# O resultado vem no mesmo formato da entrada: BitBuffer para BitBuffer e lista para os demais (compatibilidade).
+def _no_formato_de(entrada, resultado):
+    if isinstance(entrada, BitBuffer):
+        return como_buffer(resultado)
+    return resultado.tolist() if isinstance(resultado, BitBuffer) else list(resultado)
+
 def dados_para_bytes(bits: list[int]) -> list[list[int]]:
     """Auxiliar: Quebra uma lista de bits em lista de listas (bytes)"""
     bytes_lista = []
@@ -29,308 +44,512 @@ def bytes_para_dados(bytes_lista: list[list[int]]) -> list[int]:
 # 1. Contagem de Caracteres
 ###########################################################
 
-def enquadrar_contagem_de_caracteres(bits: list[int]) -> list[int]:
+# O cabeçalho da contagem pode ter 1, 2 ou 4 bytes (quadros de até 255, 65535 ou 2^32 - 1 bytes)
+def _verificar_cabecalho(bytes_cabecalho: int):
+    if bytes_cabecalho not in (1, 2, 4):
+        raise ValueError(f"O cabeçalho da contagem de caracteres deve ter 1, 2 ou 4 bytes (recebido: {bytes_cabecalho})")
+
+def enquadrar_contagem_de_caracteres(bits: BitBuffer | list[int], bytes_cabecalho: int = 1) -> BitBuffer | list[int]:
     """
     Adiciona um cabeçalho no início indicando quantos bytes existem no quadro.
-    O cabeçalho também conta como um byte.
+    O cabeçalho (1, 2 ou 4 bytes) também entra na contagem.
     """
-    lista_bytes = dados_para_bytes(bits)
-    # Número de bytes de dados + 1 byte de cabeçalho
-    tamanho = len(lista_bytes) + 1 
+    _verificar_cabecalho(bytes_cabecalho)
+    buffer = como_buffer(bits)
+    # Número de bytes de dados (o último pode estar incompleto) + bytes do cabeçalho
+    tamanho = (len(buffer) + 7) // 8 + bytes_cabecalho
     
-    # Converte o tamanho para binário (8 bits)
-    header = [int(x) for x in format(tamanho, '08b')]
+    # Um tamanho que não cabe no cabeçalho corromperia o quadro: é erro de quem enquadra
+    if tamanho >= 1 << (8 * bytes_cabecalho):
+        raise ValueError(f"Quadro de {tamanho} bytes não cabe num cabeçalho de {bytes_cabecalho} byte(s)")
+    
+    # Converte o tamanho para binário (8, 16 ou 32 bits)
+    header = BitBuffer.de_inteiro(tamanho, 8 * bytes_cabecalho)
     
     # Retorna Header + Dados
-    return header + bits
+    return _no_formato_de(bits, header + buffer)
 
-def desenquadrar_contagem_de_caracteres(bits: list[int]) -> list[int]:
+def desenquadrar_contagem_de_caracteres(bits: BitBuffer | list[int], bytes_cabecalho: int = 1) -> BitBuffer | list[int]:
     """
-    Lê o primeiro byte para saber o tamanho e extrai os dados.
+    Lê o cabeçalho para saber o tamanho e extrai os dados.
     """
-    if len(bits) < 8: return []
+    _verificar_cabecalho(bytes_cabecalho)
+    bits_cabecalho = 8 * bytes_cabecalho
+    if len(bits) < bits_cabecalho: return _no_formato_de(bits, [])
+    buffer = como_buffer(bits)
     
-    # Lê o header (primeiros 8 bits)
-    header = bits[:8]
-    # Converte binário para inteiro manualmente ou com int()
-    tamanho_total = int("".join(str(x) for x in header), 2)
+    # Lê o header e converte para inteiro
+    tamanho_total = buffer[:bits_cabecalho].para_inteiro()
     
     # O payload são os bits restantes. 
-    # Obs: Em uma simulação real de fluxo contínuo, usaríamos 'tamanho_total' 
+    # Obs: para vários quadros num fluxo contínuo, DesenquadradorContagem usa 'tamanho_total' 
     # para saber onde cortar o próximo quadro. Aqui pegamos o restante.
-    payload = bits[8 : 8 + (tamanho_total - 1) * 8]
+    payload = buffer[bits_cabecalho : bits_cabecalho + (tamanho_total - bytes_cabecalho) * 8]
     
-    return payload
+    return _no_formato_de(bits, payload)
 
 ###########################################################
 # 2. Inserção de Bytes (Byte Stuffing)
 ###########################################################
 
-def enquadrar_insercao_de_bytes(bits: list[int]) -> list[int]:
+# Os mesmos bytes especiais como bytes
+_FLAG_BYTES = bytes([_FLAG])
+_ESC_BYTES = bytes([_ESC])
+
+def inserir_escape(dados: bytes | bytearray | memoryview) -> bytes:
+    """
+    Insere um ESC antes de cada FLAG ou ESC dos dados. O ESC é tratado primeiro, para não duplicar
+    os ESCs que acabaram de ser inseridos antes das FLAGs.
+    """
+    return bytes(dados).replace(_ESC_BYTES, _ESC_BYTES * 2).replace(_FLAG_BYTES, _ESC_BYTES + _FLAG_BYTES)
+
+def remover_escape(conteudo: bytes | bytearray | memoryview) -> bytes:
+    """
+    Desfaz inserir_escape: o byte depois de um ESC é dado (mesmo que pareça FLAG ou ESC),
+    uma FLAG sem escape no meio é descartada, assim como um ESC solto no fim.
+    """
+    # Sem nenhum ESC só as FLAGs soltas saem
+    if _ESC not in conteudo:
+        return bytes(conteudo).replace(_FLAG_BYTES, b'')
+    
+    dados = np.frombuffer(conteudo, dtype=np.uint8)
+    eh_esc = dados == _ESC
+    
+    # Numa sequência de ESCs seguidos, o 1º, 3º, 5º... são escapes e cada um protege o byte seguinte
+    posicoes = np.arange(len(dados))
+    inicio_da_sequencia = np.maximum.accumulate(np.where(eh_esc, 0, posicoes + 1))
+    escape = eh_esc & ((posicoes - inicio_da_sequencia) % 2 == 0)
+    protegido = np.zeros_like(escape)
+    protegido[1:] = escape[:-1]
+    
+    return dados[~escape & (protegido | (dados != _FLAG))].tobytes()
+
+def enquadrar_insercao_de_bytes(bits: BitBuffer | list[int]) -> BitBuffer | list[int]:
     """
     Usa uma FLAG no inicio e fim. Se a FLAG ou ESC aparecerem nos dados,
     insere um ESC antes.
     """
-    lista_bytes = dados_para_bytes(bits)
-    quadro_bytes = []
+    # bytes dos dados (o último é completado com zeros)
+    dados = como_buffer(bits).visao_bytes()
     
-    # Adiciona FLAG de início
-    quadro_bytes.append(FLAG_BYTE)
+    # FLAG de início + dados com escape + FLAG de fim
+    quadro_bytes = _FLAG_BYTES + inserir_escape(dados) + _FLAG_BYTES
     
-    for byte in lista_bytes:
-        # Se o byte de dados for igual à FLAG ou igual ao ESC, insere ESC antes
-        if byte == FLAG_BYTE or byte == ESC_BYTE:
-            quadro_bytes.append(ESC_BYTE)
-        quadro_bytes.append(byte)
-        
-    # Adiciona FLAG de fim
-    quadro_bytes.append(FLAG_BYTE)
-    
-    return bytes_para_dados(quadro_bytes)
+    return _no_formato_de(bits, BitBuffer.de_bytes(quadro_bytes))
 
-def desenquadrar_insercao_de_bytes(bits: list[int]) -> list[int]:
+def desenquadrar_insercao_de_bytes(bits: BitBuffer | list[int]) -> BitBuffer | list[int]:
     """
     Remove as FLAGS e trata o caractere de escape (ESC).
     """
-    lista_bytes = dados_para_bytes(bits)
-    dados_recuperados = []
-    
-    ignorar_proximo = False # Flag para pular bytes que são apenas delimitadores processados
-    escape_ativo = False    # Indica se o byte anterior foi um ESC
+    lista_bytes = como_buffer(bits).visao_bytes()
     
     # Ignora a primeira FLAG (início) e assume que a última é FLAG (fim)
     # Em um stream real, teríamos que buscar a FLAG.
     conteudo = lista_bytes[1:-1] 
     
-    for byte in conteudo:
-        if escape_ativo:
-            # Se o anterior foi ESC, este byte é dado (mesmo que pareça FLAG ou ESC)
-            dados_recuperados.append(byte)
-            escape_ativo = False
-        else:
-            if byte == ESC_BYTE:
-                escape_ativo = True # Próximo byte será tratado como dado puro
-            elif byte == FLAG_BYTE:
-                # Se achou uma flag sem escape no meio, algo deu errado ou é fim de quadro
-                continue 
-            else:
-                dados_recuperados.append(byte)
-                
-    return bytes_para_dados(dados_recuperados)
+    return _no_formato_de(bits, BitBuffer.de_bytes(remover_escape(conteudo)))
 
 ###########################################################
 # 3. Inserção de Bits (Bit Stuffing)
 ###########################################################
 
-def enquadrar_insercao_de_bits(bits: list[int]) -> list[int]:
+# As regras bit a bit viram tabelas (estado x byte) com os bits de saída e o próximo estado,
+# e os quadros são processados um byte por consulta. O estado é a quantidade de '1's seguidos.
+
+# Inserção: depois do quinto '1' seguido entra um '0'. passo(estado, bit) -> (valor, quantidade de bits, estado)
+def _passo_insercao(uns: int, bit: int) -> tuple[int, int, int]:
+    if bit == 0:
+        return 0, 1, 0
+    if uns == 4:
+        return 0b10, 2, 0
+    return 1, 1, uns + 1
+
+# Remoção: o '0' logo depois de exatamente cinco '1's foi inserido e sai (6 = seis ou mais '1's)
+def _passo_remocao(uns: int, bit: int) -> tuple[int, int, int]:
+    if bit == 1:
+        return 1, 1, min(uns + 1, 6)
+    if uns == 5:
+        return 0, 0, 0
+    return 0, 1, 0
+
+# tabela[estado * 256 + byte] = (valor, quantidade de bits, próximo estado) de aplicar passo aos 8 bits do byte
+def _tabela_por_byte(passo, n_estados: int) -> list[tuple[int, int, int]]:
+    tabela = []
+    for estado_inicial in range(n_estados):
+        for byte in range(256):
+            valor, tamanho, estado = 0, 0, estado_inicial
+            for k in range(7, -1, -1):
+                v, t, estado = passo(estado, (byte >> k) & 1)
+                valor = (valor << t) | v
+                tamanho += t
+            tabela.append((valor, tamanho, estado))
+    return tabela
+
+_TABELA_INSERCAO = _tabela_por_byte(_passo_insercao, 5)
+_TABELA_REMOCAO = _tabela_por_byte(_passo_remocao, 7)
+
+def _converter_bits(bits: BitBuffer, tabela, passo, estado: int = 0) -> tuple[BitBuffer, int]:
+    """
+    Aplica a regra a todos os bits: um byte por consulta à tabela e, no byte incompleto do fim, bit a bit.
+    Retorna os bits de saída e o estado final (para continuar em outro pedaço do fluxo).
+    """
+    saida = bytearray()
+    acumulado, n_acumulado = 0, 0  # bits de saída que ainda não formam um byte
+    completos = len(bits) // 8
+    
+    for byte in bits.visao_bytes()[:completos]:
+        valor, tamanho, estado = tabela[(estado << 8) | byte]
+        acumulado = (acumulado << tamanho) | valor
+        n_acumulado += tamanho
+        while n_acumulado >= 8:
+            n_acumulado -= 8
+            saida.append(acumulado >> n_acumulado)
+            acumulado &= (1 << n_acumulado) - 1
+    
+    for bit in bits[completos * 8:]:
+        valor, tamanho, estado = passo(estado, bit)
+        acumulado = (acumulado << tamanho) | valor
+        n_acumulado += tamanho
+    
+    # o que sobrou (até 16 bits) vai alinhado à esquerda nos últimos bytes
+    total = 8 * len(saida) + n_acumulado
+    n_bytes_finais = (n_acumulado + 7) // 8
+    saida += (acumulado << (8 * n_bytes_finais - n_acumulado)).to_bytes(n_bytes_finais, 'big')
+    return BitBuffer.de_bytes(saida, total), estado
+
+def enquadrar_insercao_de_bits(bits: BitBuffer | list[int]) -> BitBuffer | list[int]:
     """
     FLAG: 01111110.
     Sempre que aparecerem cinco '1's seguidos nos dados, insere um '0'.
     """
-    quadro = []
-    
-    # FLAG de Início
-    quadro.extend(FLAG_BIT)
+    dados, _ = _converter_bits(como_buffer(bits), _TABELA_INSERCAO, _passo_insercao)
     
-    contador_uns = 0
-    for bit in bits:
-        quadro.append(bit)
-        if bit == 1:
-            contador_uns += 1
-            if contador_uns == 5:
-                # Inserção do bit 0 (stuffing)
-                quadro.append(0)
-                contador_uns = 0
-        else:
-            contador_uns = 0
-            
-    # FLAG de Fim
-    quadro.extend(FLAG_BIT)
-    
-    return quadro
+    # FLAG de Início + dados + FLAG de Fim
+    flag = BitBuffer(FLAG_BIT)
+    return _no_formato_de(bits, flag + dados + flag)
 
-def desenquadrar_insercao_de_bits(bits: list[int]) -> list[int]:
+def desenquadrar_insercao_de_bits(bits: BitBuffer | list[int]) -> BitBuffer | list[int]:
     """
     Remove as FLAGS e remove o '0' inserido após cinco '1's.
     """
     # Remove as flags (assumindo 8 bits cada nas pontas)
-    if len(bits) < 16: return []
-    payload_raw = bits[8:-8]
-    
-    dados = []
-    contador_uns = 0
-    i = 0
+    if len(bits) < 16: return _no_formato_de(bits, [])
+    payload_raw = como_buffer(bits)[8:-8]
     
-    while i < len(payload_raw):
-        bit = payload_raw[i]
-        
-        if bit == 1:
-            contador_uns += 1
-            dados.append(bit)
-            i += 1
-        else:
-            # Se é zero
-            if contador_uns == 5:
-                # Este zero foi inserido pelo transmissor (stuffing), ignorar.
-                i += 1 
-                contador_uns = 0
-            else:
-                dados.append(bit)
-                contador_uns = 0
-                i += 1
-                
-    return dados
+    dados, _ = _converter_bits(payload_raw, _TABELA_REMOCAO, _passo_remocao)
+    return _no_formato_de(bits, dados)
+
+# Busca da FLAG: o estado são os últimos 7 bits vistos. _FIM_DA_FLAG[estado * 256 + byte] = posições (0 a 7)
+# dentro do byte em que termina uma FLAG (duas FLAGs podem dividir o '0' do meio, então pode haver mais de uma)
+_JANELAS = (np.arange(128 * 256) >> np.arange(7, -1, -1)[:, None]) & 0xFF  # janela de 8 bits terminando em cada k
+_MASCARA_DA_FLAG = ((_JANELAS == 0x7E) << np.arange(8)[:, None]).sum(axis=0)
+_FIM_DA_FLAG = [tuple(k for k in range(8) if (mascara >> k) & 1) for mascara in range(256)]
+_FIM_DA_FLAG = [_FIM_DA_FLAG[mascara] for mascara in _MASCARA_DA_FLAG.tolist()]
+
+def encontrar_flags(bits: BitBuffer | list[int]) -> list[int]:
+    """
+    Posições (do primeiro bit) de todas as FLAGs (01111110) nos bits, consultando um byte por vez.
+    """
+    posicoes, _ = _buscar_flags(como_buffer(bits))
+    return posicoes
+
+# Busca as FLAGs continuando de um estado anterior (os 7 últimos bits do pedaço anterior do fluxo).
+# O estado inicial é só de '1's: uma FLAG nunca é formada com bits de antes do início.
+# Uma FLAG que começou no pedaço anterior tem posição negativa.
+def _buscar_flags(buffer: BitBuffer, estado: int = 0x7F) -> tuple[list[int], int]:
+    posicoes = []
+    completos = len(buffer) // 8
+    
+    for indice, byte in enumerate(buffer.visao_bytes()[:completos]):
+        janela = (estado << 8) | byte
+        for k in _FIM_DA_FLAG[janela]:
+            posicoes.append(8 * indice + k - 7)
+        estado = janela & 0x7F
+    
+    for i, bit in enumerate(buffer[completos * 8:], start=completos * 8):
+        janela = (estado << 1) | bit
+        if janela & 0xFF == 0x7E:
+            posicoes.append(i - 7)
+        estado = janela & 0x7F
+    return posicoes, estado
 
 ###########################################################
 # 4. Detecção de Erros: Bit de Paridade Par
 ###########################################################
 
-def adicionar_paridade_par(bits: list[int]) -> list[int]:
+def adicionar_paridade_par(bits: BitBuffer | list[int]) -> BitBuffer | list[int]:
     """
     Adiciona 1 bit ao final. O bit será 1 se o número de '1's for ímpar,
     para tornar o total par.
     """
-    qtd_uns = sum(bits)
+    qtd_uns = como_buffer(bits).contar_uns()
     paridade = 1 if (qtd_uns % 2 != 0) else 0
     return bits + [paridade]
 
-def verificar_paridade_par(bits: list[int]) -> bool:
+def verificar_paridade_par(bits: BitBuffer | list[int]) -> bool:
     """
     Verifica se a paridade do conjunto (dados + bit paridade) está correta.
     """
-    if not bits: return True
-    return (sum(bits) % 2) == 0
+    if not len(bits): return True
+    return (como_buffer(bits).contar_uns() % 2) == 0
 
 ###########################################################
 # 5. Detecção de Erros: Checksum (16 bits)
 ###########################################################
 
-def _calcular_checksum_16b(bits: list[int]) -> list[int]:
+# Soma em complemento de um das palavras de 16 bits (big-endian) dos bytes: todas as palavras são somadas de uma
+# vez e os "vai-um" (carries) voltam para os 16 bits de baixo só no final. Um byte final sem par é a parte alta
+# da última palavra (padding com zeros à direita).
+def _soma_complemento_de_um(dados) -> int:
+    impar = len(dados) % 2
+    palavras = np.frombuffer(dados[:len(dados) - impar], dtype='>u2')
+    soma = int(palavras.sum(dtype=np.uint64))
+    if impar:
+        soma += dados[-1] << 8
+    return _dobrar_carries(soma)
+
+# Soma os bits acima de 16 de volta aos 16 de baixo até não sobrar nenhum (end-around carry)
+def _dobrar_carries(soma: int) -> int:
+    while soma >> 16:
+        soma = (soma & 0xFFFF) + (soma >> 16)
+    return soma
+
+# Palavras de 16 bits de um trecho de bits (completado com zeros, como na soma)
+def _palavras_16b(bits: BitBuffer) -> list[int]:
+    dados = bits.para_bytes()
+    if len(dados) % 2 != 0:
+        dados += b'\x00'
+    return np.frombuffer(dados, dtype='>u2').tolist()
+
+def _calcular_checksum_16b(bits: BitBuffer | list[int]) -> BitBuffer:
     """
     Algoritmo de Checksum (estilo Internet Checksum - RFC 1071).
     Soma palavras de 16 bits e faz o complemento de 1.
     """
-    # 1. Garante que a lista é par (múltiplo de 16 bits para a soma)
-    # Se sobrar bits (ex: 8 bits), fazemos padding com zeros à direita para formar a última palavra
-    dados = list(bits)
-    while len(dados) % 16 != 0:
-        dados.append(0)
-        
-    soma = 0
-    # 2. Percorre de 16 em 16 bits
-    for i in range(0, len(dados), 16):
-        bloco = dados[i:i+16]
-        # Converte lista de bits para inteiro
-        valor = int("".join(str(b) for b in bloco), 2)
-        soma += valor
-        
-        # 3. Trata o overflow (wrap around) se a soma passar de 16 bits (65535)
-        if soma > 0xFFFF:
-            soma = (soma & 0xFFFF) + 1
+    # Se sobrar bits (ex: 8 bits), o último byte/palavra é completado com zeros à direita
+    soma = _soma_complemento_de_um(como_buffer(bits).visao_bytes())
             
-    # 4. Complemento de 1 (inverte os bits)
-    checksum = ~soma & 0xFFFF
-    
-    # Retorna como lista de 16 bits
-    return [int(x) for x in format(checksum, '016b')]
+    # Complemento de 1 (inverte os bits), retornado como 16 bits
+    return BitBuffer.de_inteiro(~soma & 0xFFFF, 16)
 
-def adicionar_checksum(bits: list[int]) -> list[int]:
+def adicionar_checksum(bits: BitBuffer | list[int]) -> BitBuffer | list[int]:
     """
     Calcula o checksum dos dados e anexa ao final (16 bits).
     """
     cks = _calcular_checksum_16b(bits)
-    return bits + cks
+    return _no_formato_de(bits, como_buffer(bits) + cks)
 
-def verificar_checksum(bits: list[int]) -> bool:
+def verificar_checksum(bits: BitBuffer | list[int]) -> bool:
     """
-    Recalcula o checksum de todo o quadro (dados + checksum recebido).
-    Em lógica de complemento de 1, a soma total deve ser 0 (ou 0xFFFF dependendo da implementação).
-    Aqui, vamos separar: recalcula o checksum da parte de dados e compara com o final.
+    Em lógica de complemento de 1, a soma dos dados com o checksum recebido deve dar 0xFFFF.
+    A soma é feita numa única passada sobre os bytes do quadro, sem separar dados e checksum.
     """
     if len(bits) < 16: return False
-    
-    dados = bits[:-16]
-    checksum_recebido = bits[-16:]
-    
-    checksum_calculado = _calcular_checksum_16b(dados)
-    
-    return checksum_calculado == checksum_recebido
+    buffer = como_buffer(bits)
+    n_dados = len(buffer) - 16
+    
+    # Dados que não terminam num byte completo (quadro desalinhado): separa e compara
+    if n_dados % 8 != 0:
+        return _calcular_checksum_16b(buffer[:n_dados]) == buffer[n_dados:]
+    
+    quadro = buffer.visao_bytes()
+    fim_dados = n_dados // 8
+    checksum_recebido = (quadro[fim_dados] << 8) | quadro[fim_dados + 1]
+    # Sem dobrar o carry desta última soma: 0xFFFF + 0xFFFF (as duas representações do zero, ex: uma linha
+    # presa em 1) não é aceito, como na comparação com o checksum recalculado
+    return _soma_complemento_de_um(quadro[:fim_dados]) + checksum_recebido == 0xFFFF
+
+def atualizar_checksum(checksum: int, palavras_antigas: list[int], palavras_novas: list[int]) -> int:
+    """
+    Atualização incremental do checksum (RFC 1624, eq. 3): HC' = ~(~HC + ~m + m') para cada palavra m
+    trocada por m'. Custa O(palavras alteradas) em vez de somar o quadro inteiro de novo.
+    Um resultado 0x0000 é ambíguo: o recálculo completo dá 0x0000 se a soma dos dados for 0xFFFF e 0xFFFF se os
+    dados forem todos zero (ver substituir_bits_com_checksum, que olha os dados nesse caso).
+    """
+    soma = ~checksum & 0xFFFF
+    for antiga, nova in zip(palavras_antigas, palavras_novas):
+        soma += (~antiga & 0xFFFF) + nova
+    return ~_dobrar_carries(soma) & 0xFFFF
+
+def substituir_bits_com_checksum(quadro: BitBuffer | list[int], posicao: int,
+                                 novos_bits: BitBuffer | list[int]) -> BitBuffer | list[int]:
+    """
+    Troca os bits dos dados de um quadro com checksum (saída de adicionar_checksum) a partir de posicao,
+    ex: o número de sequência de um quadro retransmitido, e corrige o checksum do final de forma incremental.
+    """
+    buffer = como_buffer(quadro)
+    novos = como_buffer(novos_bits)
+    n_dados = len(buffer) - 16
+    if posicao < 0 or posicao + len(novos) > n_dados:
+        raise ValueError("Os novos bits devem ficar dentro dos dados do quadro")
+    
+    # Palavras de 16 bits tocadas pela troca (a última pode ser a palavra incompleta do fim dos dados)
+    inicio = posicao // 16 * 16
+    fim = min(n_dados, -(-(posicao + len(novos)) // 16) * 16)
+    antigas = buffer[inicio:fim]
+    novas = antigas[:posicao - inicio] + novos + antigas[posicao - inicio + len(novos):]
+    
+    checksum = atualizar_checksum(buffer[n_dados:].para_inteiro(), _palavras_16b(antigas), _palavras_16b(novas))
+    dados = buffer[:inicio] + novas + buffer[fim:n_dados]
+    # dados todos zero: a soma é 0x0000 e o checksum 0xFFFF, como no recálculo (só aqui os dados são percorridos)
+    if checksum == 0 and dados.contar_uns() == 0:
+        checksum = 0xFFFF
+    resultado = dados + BitBuffer.de_inteiro(checksum, 16)
+    return _no_formato_de(quadro, resultado)
 
 ###########################################################
 # 6. Detecção de Erros: CRC-32 (IEEE 802)
 ###########################################################
 
-def _calcular_crc32(bits: list[int]) -> list[int]:
+# Polinômio do modo 'DIVISAO'. A lista de 32 bits do gerador usada na divisão longa original
+# (1000 0010 0110 0001 0001 1101 1011 0111) perdeu um dos zeros de 0x104C11DB7, então ela calcula um CRC de
+# 31 bits com gerador x^31 + 0x02611DB7 e devolve o resto seguido de um bit 0. Num registrador de 32 bits isso
+# é o CRC direto (não refletido, valor inicial 0, sem XOR final) com o polinômio alinhado à esquerda.
+_POLINOMIO_DIVISAO = 0x02611DB7 << 1
+_MASCARA_32 = 0xFFFFFFFF
+
+def _tabelas_crc(polinomio: int, n_tabelas: int = 8) -> list[list[int]]:
+    """
+    tabelas[0][b] é o CRC do byte b e tabelas[k][b] o do byte b seguido de k bytes zero (slice-by-8):
+    oito bytes de entrada viram oito consultas independentes em vez de oito passos encadeados.
+    """
+    tabela = []
+    for byte in range(256):
+        crc = byte << 24
+        for _ in range(8):
+            crc = ((crc << 1) & _MASCARA_32) ^ (polinomio if crc & 0x80000000 else 0)
+        tabela.append(crc)
+    tabelas = [tabela]
+    for _ in range(1, n_tabelas):
+        tabelas.append([((crc << 8) & _MASCARA_32) ^ tabela[crc >> 24] for crc in tabelas[-1]])
+    return tabelas
+
+_TABELAS_DIVISAO = _tabelas_crc(_POLINOMIO_DIVISAO)
+
+def _crc_divisao_bytes(crc: int, dados: bytes) -> int:
+    """Continua o CRC do modo 'DIVISAO' sobre bytes completos: 8 bytes por passo e o resto byte a byte."""
+    t0, t1, t2, t3, t4, t5, t6, t7 = _TABELAS_DIVISAO
+    n_blocos = len(dados) // 8 * 8
+    for alto, baixo in struct.iter_unpack('>II', dados[:n_blocos]):
+        alto ^= crc
+        crc = (t7[alto >> 24] ^ t6[(alto >> 16) & 0xFF] ^ t5[(alto >> 8) & 0xFF] ^ t4[alto & 0xFF] ^
+               t3[baixo >> 24] ^ t2[(baixo >> 16) & 0xFF] ^ t1[(baixo >> 8) & 0xFF] ^ t0[baixo & 0xFF])
+    for byte in dados[n_blocos:]:
+        crc = ((crc << 8) & _MASCARA_32) ^ t0[(crc >> 24) ^ byte]
+    return crc
+
+class CRC32:
+    """
+    CRC-32 incremental orientado a tabela. update() recebe bytes, BitBuffer ou lista de bits quantas vezes
+    for preciso (quadros em pedaços); digest() devolve o CRC dos dados vistos até agora, sem encerrar o cálculo.
+    Modos:
+    'DIVISAO' (padrão): os mesmos 32 bits da divisão polinomial original (não refletido, valor inicial 0).
+    'IEEE': CRC-32 do IEEE 802.3 (refletido, valor inicial e XOR final 0xFFFFFFFF) calculado pelo zlib;
+            só é definido para bytes completos.
+    """
+
+    def __init__(self, dados=None, modo: str = 'DIVISAO'):
+        self.modo = modo.upper()
+        if self.modo not in ('DIVISAO', 'IEEE'):
+            raise ValueError(f"Modo de CRC-32 desconhecido: {modo}")
+        self._crc = 0
+        self._pendente = BitBuffer()  # bits de um byte incompleto, à espera dos próximos dados
+        if dados is not None:
+            self.update(dados)
+
+    def update(self, dados):
+        if isinstance(dados, (bytes, bytearray, memoryview)):
+            if not len(self._pendente):
+                self._atualizar_bytes(dados)
+                return
+            dados = BitBuffer.de_bytes(bytes(dados))
+        bits = self._pendente + como_buffer(dados)
+        completos = len(bits) // 8 * 8
+        self._atualizar_bytes(bits[:completos].para_bytes())
+        self._pendente = bits[completos:]
+
+    def _atualizar_bytes(self, dados):
+        if self.modo == 'IEEE':
+            self._crc = zlib.crc32(dados, self._crc)
+        else:
+            self._crc = _crc_divisao_bytes(self._crc, dados)
+
+    # valor do CRC como inteiro de 32 bits
+    def valor(self) -> int:
+        if not len(self._pendente):
+            return self._crc
+        if self.modo == 'IEEE':
+            raise ValueError("O CRC-32 IEEE só é definido para bytes completos")
+
+        # os bits do byte incompleto entram um a um
+        crc = self._crc
+        for bit in self._pendente:
+            topo = (crc >> 31) ^ bit
+            crc = (crc << 1) & _MASCARA_32
+            if topo:
+                crc ^= _POLINOMIO_DIVISAO
+        return crc
+
+    # 4 bytes na ordem em que são anexados ao quadro (no IEEE, o byte menos significativo primeiro, como no Ethernet)
+    def digest(self) -> bytes:
+        return self.valor().to_bytes(4, 'little' if self.modo == 'IEEE' else 'big')
+
+    # os mesmos 32 bits do digest, prontos para anexar aos dados
+    def digest_bits(self) -> BitBuffer:
+        return BitBuffer.de_bytes(self.digest())
+
+    def copy(self) -> 'CRC32':
+        copia = CRC32(modo=self.modo)
+        copia._crc = self._crc
+        copia._pendente = BitBuffer(self._pendente)
+        return copia
+
+def _calcular_crc32(bits: BitBuffer | list[int], modo: str = 'DIVISAO') -> BitBuffer:
     """
-    Implementação manual do CRC-32 (IEEE 802.3).
-    Polinômio: 0x04C11DB7 (x^32 + x^26 + ... + 1)
+    CRC-32 com o polinômio 0x04C11DB7 (x^32 + x^26 + ... + 1).
     
     Nota: O padrão Ethernet usa:
     1. Valor inicial 0xFFFFFFFF
-    2. Processamento bit a bit (geralmente LSB first, mas aqui faremos direto na lógica polinomial)
+    2. Processamento LSB first (refletido)
     3. Inversão final (XOR 0xFFFFFFFF)
     
-    Para fins didáticos e compatibilidade com verificadores simples online, 
-    vamos implementar a DIVISÃO POLINOMIAL padrão com o polinômio 0x04C11DB7.
+    Para fins didáticos o modo padrão ('DIVISAO') é a DIVISÃO POLINOMIAL direta, calculada por tabelas
+    (ver CRC32); modo='IEEE' calcula o CRC do Ethernet.
     """
-    
-    # Polinômio gerador IEEE 802.3 (33 bits, o bit mais significativo é implícito na divisão)
-    # 1 0000 0100 1100 0001 0001 1101 1011 0111
-    poly = [1, 0, 0, 0, 0, 0, 1, 0, 0, 1, 1, 0, 0, 0, 0, 1, 
-            0, 0, 0, 1, 1, 1, 0, 1, 1, 0, 1, 1, 0, 1, 1, 1] 
-
-    # Adiciona 32 zeros ao final dos dados (grau do polinômio)
-    dados_aumentados = bits + [0]*32
-    
-    # Converte para uma lista mutável para fazer a divisão (XOR)
-    resto = list(dados_aumentados)
-    
-    for i in range(len(bits)):
-        if resto[i] == 1:
-            # Faz XOR com o polinômio a partir desta posição
-            for j in range(len(poly)):
-                resto[i + j] = resto[i + j] ^ poly[j]
-                
-    # O resto são os últimos 32 bits
-    crc = resto[-(len(poly)):] # Pega os últimos 32 bits
-    return crc
+    return CRC32(bits, modo).digest_bits()
 
-def adicionar_crc(bits: list[int]) -> list[int]:
+def adicionar_crc(bits: BitBuffer | list[int], modo: str = 'DIVISAO') -> BitBuffer | list[int]:
     """
     Calcula CRC-32 e anexa ao final.
     """
-    crc = _calcular_crc32(bits)
-    return bits + crc
+    crc = _calcular_crc32(bits, modo)
+    return _no_formato_de(bits, como_buffer(bits) + crc)
 
-def verificar_crc(bits: list[int]) -> bool:
+def verificar_crc(bits: BitBuffer | list[int], modo: str = 'DIVISAO') -> bool:
     """
-    Verifica se o resto da divisão dos bits recebidos pelo polinômio é zero.
+    Recalcula o CRC dos dados recebidos (uma única passada) e compara com os 32 bits do final.
     """
     if len(bits) < 32: return False
+    buffer = como_buffer(bits)
+    dados = buffer[:-32]
     
-    # Se a mensagem está correta (Dados + CRC), ao dividir pelo polinômio, o resto deve ser zero.
-    # Reutilizamos a função _calcular_crc32 mas passando TUDO.
-    # Nota: _calcular_crc32 adiciona 32 zeros. Para verificar, 
-    # podemos simplesmente rodar a lógica de divisão nos dados recebidos sem adicionar zeros extras
-    # e ver se o final zera.
+    # O CRC IEEE só existe para bytes completos: um quadro desalinhado não pode estar correto
+    if modo.upper() == 'IEEE' and len(dados) % 8 != 0: return False
     
-    # Forma alternativa robusta: Separa e compara.
-    dados = bits[:-32]
-    crc_recebido = bits[-32:]
-    crc_calculado = _calcular_crc32(dados)
-    
-    return crc_recebido == crc_calculado
+    return _calcular_crc32(dados, modo) == buffer[-32:]
 
 ###########################################################
 # 7. Correção de Erros: Hamming (Genérico / Payload Completo)
 ###########################################################
 
-def adicionar_hamming(bits_dados: list[int]) -> list[int]:
+def adicionar_hamming(bits_dados: BitBuffer | list[int]) -> BitBuffer | list[int]:
     """
     Implementa Hamming genérico para qualquer tamanho de payload.
     Os bits de paridade são inseridos nas posições que são potências de 2 (1, 2, 4, 8...).
     """
-    m = len(bits_dados)
+    # leitura bit a bit (mais rápida em lista)
+    dados = list(bits_dados)
+    m = len(dados)
     r = 0
     
     # 1. Calcula quantos bits de paridade (r) são necessários
@@ -351,7 +570,7 @@ def adicionar_hamming(bits_dados: list[int]) -> list[int]:
         # Se i não é potência de 2, é um bit de dados
         # (i & (i - 1)) == 0 verifica se é potência de 2
         if (i & (i - 1)) != 0: 
-            mensagem[i-1] = bits_dados[j]
+            mensagem[i-1] = dados[j]
             j += 1
             
     # 4. Calcula os bits de PARIDADE
@@ -374,13 +593,28 @@ def adicionar_hamming(bits_dados: list[int]) -> list[int]:
         # Define o valor do bit de paridade
         mensagem[posicao_paridade - 1] = xor_total
         
-    return mensagem
+    return _no_formato_de(bits_dados, mensagem)
 
-def decodificar_hamming(bits_recebidos: list[int]) -> list[int]:
+def decodificar_hamming(bits_recebidos: BitBuffer | list[int]) -> BitBuffer | list[int]:
     """
     Verifica a paridade, corrige 1 bit de erro (se houver) e remove os bits de redundância.
     Retorna apenas os DADOS originais.
     """
+    dados, _, erro_posicao = _corrigir_hamming(bits_recebidos)
+    if erro_posicao > 0:
+        print(f"Hamming: Erro detectado e corrigido na posição {erro_posicao}!")
+    return dados
+
+def corrigir_hamming(bits_recebidos: BitBuffer | list[int]) -> tuple[BitBuffer | list[int], int]:
+    """
+    Como decodificar_hamming, mas também retorna quantos bits foram corrigidos (0 ou 1) e não imprime nada
+    (usado pelo simulador, cuja saída pode ser lida por programas, como na linha de comando).
+    """
+    dados, corrigidos, _ = _corrigir_hamming(bits_recebidos)
+    return dados, corrigidos
+
+# retorna os dados, quantos bits foram corrigidos e a posição do erro (base 1; 0 se a síndrome for zero)
+def _corrigir_hamming(bits_recebidos: BitBuffer | list[int]) -> tuple[BitBuffer | list[int], int, int]:
     n = len(bits_recebidos)
     # Precisamos descobrir quantos bits são de paridade (r) com base no tamanho total (n)
     # Sabemos que n = m + r. A relação de hamming bits é logarítmica.
@@ -389,6 +623,7 @@ def decodificar_hamming(bits_recebidos: list[int]) -> list[int]:
         r += 1
         
     erro_posicao = 0
+    corrigidos = 0
     
     # 1. Recalcula as paridades para achar a "Síndrome"
     for i in range(r):
@@ -407,11 +642,11 @@ def decodificar_hamming(bits_recebidos: list[int]) -> list[int]:
             
     # 2. Corrige o erro se houver (posicao > 0)
     if erro_posicao > 0:
-        print(f"Hamming: Erro detectado e corrigido na posição {erro_posicao}!")
         # Inverte o bit errado (lembrando que erro_posicao é base 1, lista é base 0)
         # Só corrigimos se estiver dentro do range (segurança)
         if erro_posicao <= n:
             bits_recebidos[erro_posicao - 1] ^= 1
+            corrigidos = 1
             
     # 3. Remove os bits de paridade e extrai os dados
     dados_recuperados = []
@@ -420,4 +655,295 @@ def decodificar_hamming(bits_recebidos: list[int]) -> list[int]:
         if (i & (i - 1)) != 0:
             dados_recuperados.append(bits_recebidos[i-1])
             
-    return dados_recuperados
\ No newline at end of file
+    return _no_formato_de(bits_recebidos, dados_recuperados), corrigidos, erro_posicao
+
+###########################################################
+# 8. Correção de Erros: Hamming em Blocos (matrizes pré-calculadas)
+###########################################################
+
+class CodigoHamming:
+    """
+    Hamming sistemático em blocos: cada k bits de dados viram um bloco com os k dados seguidos de r paridades,
+    calculadas para todos os blocos de uma vez pela matriz de paridade P (dados @ P mod 2).
+    Com estendido=True há mais um bit de paridade geral no fim do bloco (SECDED): corrige 1 erro e detecta 2.
+    O último bloco pode ter menos de k dados (código encurtado: os dados que faltam valem 0 e não são enviados).
+    """
+
+    def __init__(self, nome: str, k: int, r: int, estendido: bool = False):
+        # colunas de H para os dados: vetores de r bits com peso >= 2 (os de peso 1 são as próprias paridades)
+        colunas = [valor for valor in range(1, 2**r) if valor & (valor - 1)][:k]
+        if len(colunas) < k:
+            raise ValueError(f"{r} bits de paridade não bastam para {k} bits de dados")
+        self.nome = nome
+        self.k = k
+        self.r = r
+        self.estendido = estendido
+        self.n = k + r + int(estendido)
+
+        # pesos dos bits da síndrome (o primeiro é o mais significativo) e P: linha i = coluna de H do dado i
+        self._pesos = 1 << np.arange(r - 1, -1, -1)
+        self._P = ((np.array(colunas)[:, None] & self._pesos) != 0).astype(np.uint8)
+
+        # síndrome -> posição do bit errado no bloco (dados 0..k-1, paridades k..k+r-1); -1: nenhum bit
+        self._posicao_da_sindrome = np.full(2**r, -1, dtype=np.intp)
+        self._posicao_da_sindrome[colunas] = np.arange(k)
+        self._posicao_da_sindrome[self._pesos] = k + np.arange(r)
+
+    def codificar(self, bits_dados: BitBuffer | list[int]) -> BitBuffer | list[int]:
+        dados = como_buffer(bits_dados).para_array(np.uint8)
+        m = len(dados)
+        n_blocos = -(-m // self.k)
+        faltando = n_blocos * self.k - m
+
+        matriz = np.zeros((n_blocos, self.k), dtype=np.uint8)
+        matriz.reshape(-1)[:m] = dados
+        # uint8 pode estourar na soma do produto, mas o resto por 2 continua certo
+        paridades = (matriz @ self._P) & 1
+        partes = [matriz, paridades]
+        if self.estendido:
+            partes.append(((matriz.sum(axis=1) + paridades.sum(axis=1)) & 1).astype(np.uint8)[:, None])
+        codigo = np.concatenate(partes, axis=1).reshape(-1)
+
+        # encurta o último bloco: os zeros de preenchimento não são transmitidos
+        if faltando:
+            inicio = (n_blocos - 1) * self.n + self.k - faltando
+            codigo = np.delete(codigo, np.s_[inicio:inicio + faltando])
+        return _no_formato_de(bits_dados, codigo)
+
+    # quantidade de bits codificados para m bits de dados
+    def tamanho_codificado(self, m: int) -> int:
+        return m + -(-m // self.k) * (self.n - self.k)
+
+    def decodificar(self, bits_recebidos: BitBuffer | list[int],
+                    multiplo_dados: int = 1) -> tuple[BitBuffer | list[int], int, int]:
+        """
+        Corrige todos os blocos de uma vez pela síndrome e retorna (dados, blocos corrigidos, blocos com
+        erro não corrigível). Blocos não corrigíveis são entregues como chegaram.
+        Os dados são o maior múltiplo de multiplo_dados bits cujo código cabe no que chegou (ex: 8 para bytes);
+        os bits a mais no fim são preenchimento (do enquadramento) e são ignorados.
+        """
+        recebido = como_buffer(bits_recebidos).para_array(np.uint8)
+        redundancia = self.n - self.k
+        n_blocos, resto = divmod(len(recebido), self.n)
+        m = n_blocos * self.k + max(0, resto - redundancia)
+        m -= m % multiplo_dados
+        recebido = recebido[:self.tamanho_codificado(m)]
+
+        # recoloca os zeros omitidos do último bloco encurtado
+        n_blocos = -(-m // self.k)
+        faltando = n_blocos * self.k - m
+        if faltando:
+            inicio = len(recebido) - redundancia
+            recebido = np.insert(recebido, inicio, np.zeros(faltando, dtype=np.uint8))
+
+        blocos = recebido.reshape(n_blocos, self.n).copy()
+        dados = blocos[:, :self.k]
+        sindrome = (((dados @ self._P) ^ blocos[:, self.k:self.k + self.r]) & 1).astype(np.intp) @ self._pesos
+        posicao = self._posicao_da_sindrome[sindrome]
+
+        if self.estendido:
+            # paridade geral errada: 1 erro (síndrome 0 = erro no próprio bit de paridade geral);
+            # paridade geral certa com síndrome != 0: 2 erros
+            geral_errada = (blocos.sum(axis=1) & 1) == 1
+            corrigir = geral_errada & (sindrome != 0) & (posicao >= 0)
+            corrigidos_sem_troca = int(np.count_nonzero(geral_errada & (sindrome == 0)))
+            incorrigivel = (sindrome != 0) & ~corrigir
+        else:
+            corrigir = (sindrome != 0) & (posicao >= 0)
+            corrigidos_sem_troca = 0
+            incorrigivel = (sindrome != 0) & (posicao < 0)
+
+        # no bloco encurtado a síndrome não pode apontar para um dos dados omitidos
+        if faltando and corrigir[-1] and self.k - faltando <= posicao[-1] < self.k:
+            corrigir[-1] = False
+            incorrigivel[-1] = True
+
+        linhas = np.nonzero(corrigir)[0]
+        blocos[linhas, posicao[linhas]] ^= 1
+
+        dados_recuperados = blocos[:, :self.k].reshape(-1)[:m]
+        corrigidos = int(np.count_nonzero(corrigir)) + corrigidos_sem_troca
+        incorrigiveis = int(np.count_nonzero(incorrigivel))
+        return _no_formato_de(bits_recebidos, dados_recuperados), corrigidos, incorrigiveis
+
+    def __repr__(self):
+        return f"CodigoHamming({self.nome!r}, n={self.n}, k={self.k})"
+
+# Códigos em blocos disponíveis: nome (maiúsculas) -> CodigoHamming
+_CODIGOS_HAMMING = {codigo.nome.upper(): codigo for codigo in (
+    CodigoHamming("Hamming (7,4)", 4, 3),
+    CodigoHamming("Hamming (15,11)", 11, 4),
+    CodigoHamming("Hamming (72,64) SECDED", 64, 7, estendido=True),
+)}
+
+# recebe o nome do código em blocos e retorna o CodigoHamming
+def obter_codigo_hamming(nome: str) -> CodigoHamming:
+    codigo = _CODIGOS_HAMMING.get(nome.upper())
+    if codigo is None:
+        raise ValueError(f"Código de Hamming desconhecido: {nome}")
+    return codigo
+
+# nomes dos códigos em blocos, na ordem de definição
+def codigos_hamming() -> list[str]:
+    return [codigo.nome for codigo in _CODIGOS_HAMMING.values()]
+
+
+###########################################################
+# 9. Desenquadramento em Fluxo (vários quadros num fluxo contínuo)
+###########################################################
+
+# Os desenquadradores abaixo recebem o fluxo de bits da recepção em pedaços de qualquer tamanho (processar),
+# guardam o quadro incompleto entre as chamadas e devolvem a lista dos quadros (dados, como BitBuffer) que
+# se completaram. finalizar() encerra o fluxo. Nos enquadramentos com FLAG, toda FLAG (sem escape) delimita
+# quadros: o conteúdo entre duas FLAGs é um quadro (vazio é ignorado) e o que vem antes da primeira é
+# descartado. Um quadro maior que tamanho_maximo é descartado até a próxima FLAG (memória limitada).
+
+# Gera os quadros de um desenquadrador para uma sequência de pedaços do fluxo
+def desenquadrar_em_fluxo(desenquadrador, blocos):
+    for bloco in blocos:
+        yield from desenquadrador.processar(bloco)
+    yield from desenquadrador.finalizar()
+
+class DesenquadradorContagem:
+    """
+    Contagem de caracteres em fluxo: cada quadro ocupa os bytes indicados no cabeçalho (cabeçalho incluso).
+    Um cabeçalho inválido (menor que ele mesmo ou maior que tamanho_maximo bytes, ex: um tamanho corrompido) é
+    pulado um byte por vez até o fluxo voltar a sincronizar. Em finalizar(), o último quadro incompleto sai com
+    os bits que chegaram, como em desenquadrar_contagem_de_caracteres.
+    """
+
+    def __init__(self, bytes_cabecalho: int = 1, tamanho_maximo: int = 65536):
+        _verificar_cabecalho(bytes_cabecalho)
+        self.bytes_cabecalho = bytes_cabecalho
+        self.tamanho_maximo = tamanho_maximo
+        self._pendente = BitBuffer()
+        self.descartados = 0
+
+    def processar(self, bits: BitBuffer | list[int]) -> list[BitBuffer]:
+        buffer = self._pendente + como_buffer(bits)
+        n = 8 * self.bytes_cabecalho
+        quadros = []
+        inicio = 0
+        while len(buffer) - inicio >= n:
+            tamanho = buffer[inicio:inicio + n].para_inteiro()
+            if not self.bytes_cabecalho <= tamanho <= self.tamanho_maximo:
+                self.descartados += 1
+                inicio += 8
+                continue
+            if len(buffer) - inicio < 8 * tamanho:
+                break
+            quadros.append(buffer[inicio + n:inicio + 8 * tamanho])
+            inicio += 8 * tamanho
+        self._pendente = buffer[inicio:]
+        return quadros
+
+    def finalizar(self) -> list[BitBuffer]:
+        buffer, self._pendente = self._pendente, BitBuffer()
+        if len(buffer) < 8 * self.bytes_cabecalho:
+            return []
+        return [desenquadrar_contagem_de_caracteres(buffer, self.bytes_cabecalho)]
+
+class DesenquadradorBytes:
+    """
+    Inserção de bytes em fluxo: procura as FLAGs sem escape (uma FLAG depois de um número ímpar de ESCs
+    seguidos é dado) e desfaz o escape de cada quadro. tamanho_maximo em bytes do quadro com escape.
+    """
+
+    def __init__(self, tamanho_maximo: int = 65536):
+        self.tamanho_maximo = tamanho_maximo
+        self._sobra = BitBuffer()  # bits de um byte incompleto
+        self._quadro = None        # bytes (com escape) do quadro atual; None antes da primeira FLAG
+        self.descartados = 0
+
+    def processar(self, bits: BitBuffer | list[int]) -> list[BitBuffer]:
+        buffer = self._sobra + como_buffer(bits)
+        completos = len(buffer) // 8 * 8
+        self._sobra = buffer[completos:]
+        dados = buffer[:completos].para_bytes()
+        
+        quadros = []
+        posicao = 0
+        while posicao < len(dados):
+            fim = dados.find(_FLAG_BYTES, posicao)
+            if self._quadro is None:
+                if fim < 0:
+                    break
+                self._quadro = bytearray()
+            elif fim < 0:
+                self._quadro += dados[posicao:]
+                break
+            else:
+                self._quadro += dados[posicao:fim]
+                if _termina_em_escape(self._quadro):
+                    self._quadro.append(_FLAG)
+                elif len(self._quadro) > self.tamanho_maximo:
+                    self.descartados += 1
+                    self._quadro = bytearray()
+                elif self._quadro:
+                    quadros.append(BitBuffer.de_bytes(remover_escape(self._quadro)))
+                    self._quadro = bytearray()
+            posicao = fim + 1
+        
+        if self._quadro is not None and len(self._quadro) > self.tamanho_maximo:
+            self._quadro = None
+            self.descartados += 1
+        return quadros
+
+    def finalizar(self) -> list[BitBuffer]:
+        # um quadro sem a FLAG de fim está incompleto e é descartado
+        if self._quadro:
+            self.descartados += 1
+        self._sobra = BitBuffer()
+        self._quadro = None
+        return []
+
+# Verdadeiro se o conteúdo termina num ESC que protege o próximo byte (sequência ímpar de ESCs)
+def _termina_em_escape(conteudo: bytearray) -> bool:
+    i = len(conteudo)
+    while i and conteudo[i - 1] == _ESC:
+        i -= 1
+    return (len(conteudo) - i) % 2 == 1
+
+class DesenquadradorBits:
+    """
+    Inserção de bits em fluxo: procura as FLAGs com a busca por tabela (o estado da busca atravessa os
+    pedaços) e remove os '0's inseridos de cada quadro. tamanho_maximo em bits do quadro com inserção.
+    """
+
+    def __init__(self, tamanho_maximo: int = 8 * 65536):
+        self.tamanho_maximo = tamanho_maximo
+        self._quadro = None        # bits (com inserção) desde o fim da última FLAG; None antes da primeira
+        self._estado_busca = 0x7F  # últimos 7 bits vistos
+        self.descartados = 0
+
+    def processar(self, bits: BitBuffer | list[int]) -> list[BitBuffer]:
+        novos = como_buffer(bits)
+        flags, self._estado_busca = _buscar_flags(novos, self._estado_busca)
+        
+        # as posições das FLAGs passam a contar do início do quadro atual
+        anteriores = self._quadro if self._quadro is not None else BitBuffer()
+        buffer = anteriores + novos
+        quadros = []
+        inicio = 0 if self._quadro is not None else None
+        for flag in flags:
+            posicao = flag + len(anteriores)
+            # duas FLAGs que dividem o mesmo '0' não têm nada entre elas
+            if inicio is not None and posicao - inicio > self.tamanho_maximo:
+                self.descartados += 1
+            elif inicio is not None and posicao > inicio:
+                quadros.append(_converter_bits(buffer[inicio:posicao], _TABELA_REMOCAO, _passo_remocao)[0])
+            inicio = posicao + 8
+        
+        self._quadro = buffer[inicio:] if inicio is not None else None
+        if self._quadro is not None and len(self._quadro) > self.tamanho_maximo:
+            self._quadro = None
+            self.descartados += 1
+        return quadros
+
+    def finalizar(self) -> list[BitBuffer]:
+        # um quadro sem a FLAG de fim está incompleto e é descartado
+        if self._quadro:
+            self.descartados += 1
+        self._quadro = None
+        self._estado_busca = 0x7F
+        return []
@@ -1,568 +1,1059 @@
 # imports necessários
 import math
+import numpy as np
 import definicoes
 
 # definições globais modificaveis a partir do arquivo definicoes.py
+# (valores padrão; cada simulação pode usar os seus através de ParametrosFisicos)
 AMOSTRAS_POR_BIT = definicoes.AMOSTRAS_POR_BIT
 VOLTAGEM = definicoes.VOLTAGEM
 
+class ParametrosFisicos:
+    """
+    Parâmetros da camada física de uma simulação: amostras por bit, frequência da portadora, níveis de
+    tensão e o tipo das amostras geradas (np.float32 ou np.float64). Cada Simulador tem os seus, então
+    execuções com poucas amostras por bit e execuções para visualização convivem no mesmo processo.
+    """
+
+    def __init__(self, amostras_por_bit: int = None, portadora_freq: float = None, voltagem: float = None,
+                 amplitude: float = None, dtype=np.float64):
+        self.amostras_por_bit = definicoes.AMOSTRAS_POR_BIT if amostras_por_bit is None else int(amostras_por_bit)
+        self.portadora_freq = definicoes.PORTADORA_FREQ if portadora_freq is None else float(portadora_freq)
+        self.voltagem = definicoes.VOLTAGEM if voltagem is None else float(voltagem)
+        self.amplitude = definicoes.AMPLITUDE if amplitude is None else float(amplitude)
+        self.dtype = np.dtype(dtype)
+
+        if self.amostras_por_bit < 2:
+            raise ValueError(f"São necessárias pelo menos 2 amostras por bit (recebido {self.amostras_por_bit})")
+        # o Manchester divide o bit em duas metades iguais (ver definicoes.AMOSTRAS_POR_BIT)
+        if self.amostras_por_bit % 2:
+            raise ValueError(f"O número de amostras por bit deve ser par (recebido {self.amostras_por_bit})")
+        if self.dtype not in (np.float32, np.float64):
+            raise ValueError(f"Tipo de amostra não suportado: {self.dtype} (use float32 ou float64)")
+
+    # tipo das amostras complexas do modo IQ (complex64 para float32, complex128 para float64)
+    @property
+    def dtype_complexo(self) -> np.dtype:
+        return np.result_type(self.dtype, np.complex64)
+
+    # identifica os parâmetros nos caches de formas de onda e referências
+    def chave(self) -> tuple:
+        return (self.amostras_por_bit, self.portadora_freq, self.voltagem, self.amplitude, self.dtype.str)
+
+    def __repr__(self):
+        return (f"ParametrosFisicos(amostras_por_bit={self.amostras_por_bit}, portadora_freq={self.portadora_freq}, "
+                f"voltagem={self.voltagem}, amplitude={self.amplitude}, dtype={self.dtype.name})")
+
+# Parâmetros usados quando nenhum é informado (os valores de definicoes.py)
+PARAMETROS_PADRAO = ParametrosFisicos()
+
+def _parametros(parametros: ParametrosFisicos) -> ParametrosFisicos:
+    return PARAMETROS_PADRAO if parametros is None else parametros
+
+# Acima de metade da taxa de amostragem a frequência se confunde com outra (aliasing)
+def _verificar_nyquist(frequencia: float, p: ParametrosFisicos):
+    if frequencia >= p.amostras_por_bit / 2:
+        raise ValueError(f"Frequência de {frequencia} Hz passa da frequência de Nyquist com {p.amostras_por_bit} amostras por bit")
+
 ################################################### Modulações Digitais ###########################################
 
 # recebe uma lista de bits e o tipo de modulação, retorna a lista de níveis de tensão
-def codificar_banda_base(bits: list[int], tipo: str) -> list[float]:
+def codificar_banda_base(bits: list[int], tipo: str, parametros: ParametrosFisicos = None) -> list[float]:
+    return codificar_banda_base_vetorial(bits, tipo, parametros).tolist()
+
+# mesma codificação, mas devolve um np.ndarray (evita criar uma lista com milhões de floats)
+def codificar_banda_base_vetorial(bits: list[int], tipo: str, parametros: ParametrosFisicos = None) -> np.ndarray:
+    p = _parametros(parametros)
 
     # transforma em maiúsculas
     tipo = tipo.upper() 
 
+    # converte os bits uma única vez para um vetor
+    bits = np.asarray(bits, dtype=np.int8)
+
     # descobre o tipo e chama a função correta
     if tipo == 'NRZ-POLAR':
-        return _codificar_nrz_polar(bits)
+        return _codificar_nrz_polar(bits, p)
     elif tipo == 'MANCHESTER':
-        return _codificar_manchester(bits)
+        return _codificar_manchester(bits, p)
     elif tipo == 'BIPOLAR':
-        return _codificar_bipolar(bits)
+        return _codificar_bipolar(bits, p)
     else:
         raise ValueError(f"Tipo de modulação banda base desconhecido: {tipo}")
 
 # NRZ-POLAR: Bit 1 -> +V, Bit 0 -> -V   
-def _codificar_nrz_polar(bits: list[int]) -> list[float]:
-    # resultado
-    sinal = []
-
-    # percorre todos os bits da lista de entrada
-    for bit in bits:
-        if bit == 1:
-            nivel = VOLTAGEM
-        else:
-            nivel = -VOLTAGEM
-        
-        # adiciona a voltagem correspondente ao bit, repetida AMOSTRAS_POR_BIT vezes
-        sinal.extend([nivel] * AMOSTRAS_POR_BIT)
-    return sinal
+def _codificar_nrz_polar(bits: np.ndarray, p: ParametrosFisicos) -> np.ndarray:
+    # um nível por bit
+    niveis = np.where(bits == 1, p.voltagem, -p.voltagem).astype(p.dtype)
 
-# Manchester: Bit 1 -> Alto para Baixo (+V na 1ª metade, -V na 2ª metade), Bit 0 -> Baixo para Alto (-V na 1ª metade, +V na 2ª metade)
-def _codificar_manchester(bits: list[int]) -> list[float]:
-    # resultado
-    sinal = []
+    # repete cada nível AMOSTRAS_POR_BIT vezes
+    return np.repeat(niveis, p.amostras_por_bit, axis=-1)
 
+# Manchester: Bit 1 -> Alto para Baixo (+V na 1ª metade, -V na 2ª metade), Bit 0 -> Baixo para Alto (-V na 1ª metade, +V na 2ª metade)
+def _codificar_manchester(bits: np.ndarray, p: ParametrosFisicos) -> np.ndarray:
     # divide o número de amostras por bit ao meio
-    meio_periodo = AMOSTRAS_POR_BIT // 2
-    
-    # percorre todos os bits da lista de entrada
-    for bit in bits:
-        if bit == 1:
-            # Alto -> Baixo
-            sinal.extend([VOLTAGEM] * meio_periodo)
-            sinal.extend([-VOLTAGEM] * meio_periodo)
-        else:
-            # Baixo -> Alto
-            sinal.extend([-VOLTAGEM] * meio_periodo)
-            sinal.extend([VOLTAGEM] * meio_periodo)
-    return sinal
+    meio_periodo = p.amostras_por_bit // 2
+
+    # nível da primeira metade de cada bit, a segunda metade é o oposto
+    primeira = np.where(bits == 1, p.voltagem, -p.voltagem).astype(p.dtype)
+    metades = np.stack((primeira, -primeira), axis=-1).reshape(primeira.shape[:-1] + (-1,))
+
+    # cada metade é repetida meio_periodo vezes
+    return np.repeat(metades, meio_periodo, axis=-1)
 
 # Bipolar: Bit 1 -> Alterna entre +V e -V, Bit 0 -> 0V
-def _codificar_bipolar(bits: list[int]) -> list[float]:
-    # resultado
-    sinal = []
-    
-    # controle do ultimo bit 1, começa falso para iniciar com +V
-    ultimo_um_foi_positivo = False
-    
-    # percorre todos os bits da lista de entrada
-    for bit in bits:
-        if bit == 0:
-            nivel = 0.0
-        else:
-            if ultimo_um_foi_positivo:
-                nivel = -VOLTAGEM
-                ultimo_um_foi_positivo = False
-            else:
-                nivel = VOLTAGEM
-                ultimo_um_foi_positivo = True
-                
-        sinal.extend([nivel] * AMOSTRAS_POR_BIT)
-    return sinal
+# uns_anteriores: quantos 1s já foram transmitidos antes destes bits (continuação de um fluxo)
+def _codificar_bipolar(bits: np.ndarray, p: ParametrosFisicos, uns_anteriores: int = 0) -> np.ndarray:
+    # marca os bits 1 (qualquer valor diferente de 0, como no laço original)
+    uns = bits != 0
+
+    # contagem acumulada dos 1s: o 1º, 3º, 5º... são +V e o 2º, 4º, 6º... são -V (AMI)
+    # (num lote de quadros a contagem recomeça em cada quadro)
+    ordem = np.cumsum(uns, axis=-1) + uns_anteriores
+    niveis = np.where(uns, np.where(ordem % 2 == 1, p.voltagem, -p.voltagem), 0.0).astype(p.dtype)
+
+    return np.repeat(niveis, p.amostras_por_bit, axis=-1)
 
 ################################################### Demodulações Digitais ###########################################
 
 # recebe o sinal modulado e o tipo de modulação, retorna a lista de bits original
-def decodificar_banda_base(sinal_niveis: list[float], tipo: str) -> list[int]:
+def decodificar_banda_base(sinal_niveis: list[float], tipo: str, parametros: ParametrosFisicos = None) -> list[int]:
 
-    # transforma em maiúsculas
-    tipo = tipo.upper()
-    
     # Verifica se o sinal tem um número correto de amostras
-    if len(sinal_niveis) % AMOSTRAS_POR_BIT != 0:
+    if len(sinal_niveis) % _parametros(parametros).amostras_por_bit != 0:
         print("Aviso: O sinal recebido pode estar incompleto ou dessincronizado.")
 
+    return decodificar_banda_base_vetorial(sinal_niveis, tipo, parametros).tolist()
+
+# mesma decodificação, mas devolve um np.ndarray de bits e não imprime aviso para sinais incompletos
+def decodificar_banda_base_vetorial(sinal_niveis: list[float], tipo: str, parametros: ParametrosFisicos = None) -> np.ndarray:
+    p = _parametros(parametros)
+
+    # transforma em maiúsculas
+    tipo = tipo.upper()
+
+    # converte as amostras uma única vez para um vetor
+    sinal = np.asarray(sinal_niveis, dtype=p.dtype)
+
     # descobre o tipo e chama a função correta
     if tipo == 'NRZ-POLAR':
-        return _decodificar_nrz_polar(sinal_niveis)
+        return _decodificar_nrz_polar(sinal, p)
     elif tipo == 'MANCHESTER':
-        return _decodificar_manchester(sinal_niveis)
+        return _decodificar_manchester(sinal, p)
     elif tipo == 'BIPOLAR':
-        return _decodificar_bipolar(sinal_niveis)
+        return _decodificar_bipolar(sinal, p)
     else:
         raise ValueError(f"Tipo de decodificação banda base desconhecido: {tipo}")
 
+# Integra e descarta: média de cada bloco de AMOSTRAS_POR_BIT, incluindo o bloco final incompleto (se houver)
+def _medias_por_bit(sinal: np.ndarray, p: ParametrosFisicos) -> np.ndarray:
+    # uma linha por bit, todas as decisões numa única redução
+    blocos = _blocos_de_simbolos(sinal, p.amostras_por_bit)
+    medias = blocos.mean(axis=-1)
+
+    # a cauda truncada vira um bit a mais, como no laço original
+    cauda = sinal[..., blocos.shape[-2] * p.amostras_por_bit:]
+    if cauda.shape[-1]:
+        medias = np.concatenate((medias, cauda.mean(axis=-1, keepdims=True)), axis=-1)
+    return medias
+
 # Decodificação NRZ-Polar: Média positiva -> 1, Média negativa -> 0
-def _decodificar_nrz_polar(sinal: list[float]) -> list[int]:
-    # resultado
-    bits = []
-
-    # percorre o sinal em blocos de AMOSTRAS_POR_BIT
-    for i in range(0, len(sinal), AMOSTRAS_POR_BIT):
-        bloco = sinal[i : i + AMOSTRAS_POR_BIT]
-        if not bloco: break
-        
-        # faz a média do bloco
-        media = sum(bloco) / len(bloco)
-        
-        # se a média for positiva é 1 senão é 0
-        if media > 0:
-            bits.append(1)
-        else:
-            bits.append(0)
-    return bits
+def _decodificar_nrz_polar(sinal: np.ndarray, p: ParametrosFisicos) -> np.ndarray:
+    return (_medias_por_bit(sinal, p) > 0).astype(np.int8)
  
 # Decodificação Manchester: Verifica a transição no meio do bit, Alto -> Baixo = 1, Baixo -> Alto = 0
-def _decodificar_manchester(sinal: list[float]) -> list[int]:
-    # resultado
-    bits = []
+def _decodificar_manchester(sinal: np.ndarray, p: ParametrosFisicos) -> np.ndarray:
     # metade das amostras por bit
-    meio = AMOSTRAS_POR_BIT // 2
-
-    # percorre o sinal em blocos de AMOSTRAS_POR_BIT
-    for i in range(0, len(sinal), AMOSTRAS_POR_BIT):
-        bloco = sinal[i : i + AMOSTRAS_POR_BIT]
-        if len(bloco) < AMOSTRAS_POR_BIT: break
-
-        # Calcula a média da primeira metade e da segunda metade do bit
-        media_primeira_metade = sum(bloco[:meio]) / meio
-        media_segunda_metade = sum(bloco[meio:]) / meio
-        
-        # Se começou alto e terminou baixo -> 1
-        if media_primeira_metade > media_segunda_metade:
-            bits.append(1)
-        else:
-            bits.append(0)
-    return bits
+    meio = p.amostras_por_bit // 2
+
+    # blocos incompletos no final são descartados
+    blocos = _blocos_de_simbolos(sinal, p.amostras_por_bit)
+
+    # Calcula a média da primeira metade e da segunda metade de todos os bits
+    media_primeira_metade = blocos[..., :meio].sum(axis=-1) / meio
+    media_segunda_metade = blocos[..., meio:].sum(axis=-1) / meio
+
+    # Se começou alto e terminou baixo -> 1
+    return (media_primeira_metade > media_segunda_metade).astype(np.int8)
 
 # Decodificação Bipolar: Nível próximo de 0V -> 0, Nível positivo ou negativo significativo -> 1
-def _decodificar_bipolar(sinal: list[float]) -> list[int]:
-    # resultado
-    bits = []
+def _decodificar_bipolar(sinal: np.ndarray, p: ParametrosFisicos) -> np.ndarray:
     # limiar para decidir se é 0 ou 1 (0.5V é seguro se o sinal for +/- 1.0V)
-    limiar = VOLTAGEM / 2 
-
-    # percorre o sinal em blocos de AMOSTRAS_POR_BIT
-    for i in range(0, len(sinal), AMOSTRAS_POR_BIT):
-        bloco = sinal[i : i + AMOSTRAS_POR_BIT]
-        if not bloco: break
-
-        # calcula a média absoluta do bloco
-        media_absoluta = abs(sum(bloco) / len(bloco))
-        
-        # se é maior que o limiar é 1 senão é 0
-        if media_absoluta > limiar:
-            bits.append(1)
-        else:
-            bits.append(0)
-    return bits
+    limiar = p.voltagem / 2 
+
+    # se a média absoluta do bloco é maior que o limiar é 1 senão é 0
+    return (np.abs(_medias_por_bit(sinal, p)) > limiar).astype(np.int8)
 
 ################################################ Modulação por portadora ##############################################
 
-# Constantes para Modulação por Portadora
+# Constantes para Modulação por Portadora (valores padrão, ver ParametrosFisicos)
 PORTADORA_FREQ = definicoes.PORTADORA_FREQ   # Hz (frequência base da portadora)
 AMPLITUDE_MAX = definicoes.AMPLITUDE         # Volts
 
+# Tabelas de mapeamento (bits -> (fator de amplitude, fase em graus))
+
+# Baseado no Slide CF-12
+# Bit 0 -> 0 graus
+# Bit 1 -> 180 graus
+# Amplitude é sempre 1.0 (constante)
+TABELA_BPSK = {
+    (0,): (1.0, 0),
+    (1,): (1.0, 180)
+}
+
+# Baseado no Slide CF-12, Pág 29
+# Mapeamento de fase padrão
+TABELA_QPSK = {
+    (1, 1): (1.0, 45),
+    (1, 0): (1.0, 135),
+    (0, 0): (1.0, 225),
+    (0, 1): (1.0, 315)
+}
+
+# Baseado no Slide CF-12, Pág 41 (Diagrama Visual)
+# Amplitude 1.0 constante
+TABELA_8PSK = {
+    (0, 0, 0): (1.0, 0),
+    (0, 0, 1): (1.0, 45),
+    (1, 0, 1): (1.0, 90),
+    (1, 1, 1): (1.0, 135),
+    (0, 1, 1): (1.0, 180),
+    (0, 1, 0): (1.0, 225),
+    (1, 1, 0): (1.0, 270),
+    (1, 0, 0): (1.0, 315)
+}
+
+TABELA_16QAM = {
+    # Quadribit : (Amplitude, Fase)
+    (0, 0, 0, 0): (0.33, 225),
+    (0, 0, 0, 1): (0.75, 255),
+    (0, 0, 1, 0): (0.75, 195),
+    (0, 0, 1, 1): (1.00, 225),
+    (0, 1, 0, 0): (0.33, 135),
+    (0, 1, 0, 1): (0.75, 105),
+    (0, 1, 1, 0): (0.75, 165),
+    (0, 1, 1, 1): (1.00, 135),
+    (1, 0, 0, 0): (0.33, 315),
+    (1, 0, 0, 1): (0.75, 285),
+    (1, 0, 1, 0): (0.75, 345),
+    (1, 0, 1, 1): (1.00, 315),
+    (1, 1, 0, 0): (0.33, 45),
+    (1, 1, 0, 1): (0.75, 75),
+    (1, 1, 1, 0): (0.75, 15),
+    (1, 1, 1, 1): (1.00, 45)
+}
+
 # recebe uma lista de bits e o tipo de modulação, retorna a lista de amostras do sinal modulado
-def modular_portadora(bits: list[int], tipo: str) -> list[float]:
-    tipo = tipo.upper()
-    if tipo == 'ASK':
-        return _modular_ask(bits)
-    elif tipo == 'FSK':
-        return _modular_fsk(bits)
-    elif tipo == 'BPSK': 
-        return _modular_bpsk(bits)
-    elif tipo == 'QPSK':
-        return _modular_qpsk(bits)
-    elif tipo == '8PSK': 
-        return _modular_8psk(bits)
-    elif tipo == '16-QAM':
-        return _modular_16qam(bits)
-    else:
-        raise ValueError(f"Modulação desconhecida: {tipo}")
-    
-# Modulação ASK: Bit 1 -> Onda senoidal com amplitude A, Bit 0 -> Amplitude 0
-def _modular_ask(bits: list[int]) -> list[float]:
-    sinal = []
-    for bit in bits:
-        amp = AMPLITUDE_MAX if bit == 1 else 0.0
-        for i in range(AMOSTRAS_POR_BIT):
-            t = i / AMOSTRAS_POR_BIT
-            sinal.append(amp * math.sin(2 * math.pi * PORTADORA_FREQ * t))
-    return sinal
-
-# Modulação FSK: Bit 1 -> Frequência alta, Bit 0 -> Frequência baixa
-def _modular_fsk(bits: list[int]) -> list[float]:   
-    sinal = []
-    f1 = PORTADORA_FREQ * 2
-    f2 = PORTADORA_FREQ
-    for bit in bits:
-        freq = f1 if bit == 1 else f2
-        for i in range(AMOSTRAS_POR_BIT):
-            t = i / AMOSTRAS_POR_BIT
-            sinal.append(AMPLITUDE_MAX * math.sin(2 * math.pi * freq * t))
-    return sinal    
-
-# Agrupa bits em tuplas de tamanho_grupo
-def _agrupar_bits(bits: list[int], tamanho_grupo: int) -> list[tuple]:
-    # resultado
-    grupos = []
-    for i in range(0, len(bits), tamanho_grupo):
-        grupo = tuple(bits[i:i+tamanho_grupo])
-        # Preenche com 0 se faltar bits no último grupo (padding)
-        if len(grupo) < tamanho_grupo:
-             grupo = grupo + (0,) * (tamanho_grupo - len(grupo))
-        grupos.append(grupo)
-    return grupos
-
-# recebe os bits, o número de bits por símbolo e uma tabela de mapeamento com amplitude e fase e retorna o sinal modulado
-def _modular_generico_tabela(bits: list[int], bits_por_simbolo: int, tabela: dict) -> list[float]:
-    sinal = []
-    grupos = _agrupar_bits(bits, bits_por_simbolo)
-    
-    for grupo in grupos:
-        amp_fator, fase_graus = tabela.get(grupo, (1.0, 0.0))
-        fase_rad = math.radians(fase_graus)
-        amplitude_final = AMPLITUDE_MAX * amp_fator
-        
-        for i in range(AMOSTRAS_POR_BIT):
-            t = i / AMOSTRAS_POR_BIT
-            # CORREÇÃO: Usar math.cos para alinhar fase 0 com eixo X
-            amostra = amplitude_final * math.cos(2 * math.pi * PORTADORA_FREQ * t + fase_rad)
-            sinal.append(amostra)
-            
-    return sinal
-
-# Modulação BPSK: Bit 0 -> 0 graus, Bit 1 -> 180 graus
-def _modular_bpsk(bits: list[int]) -> list[float]:
-    # Baseado no Slide CF-12
-    # Bit 0 -> 0 graus
-    # Bit 1 -> 180 graus
-    # Amplitude é sempre 1.0 (constante)
-    tabela_bpsk = {
-        (0,): (1.0, 0),
-        (1,): (1.0, 180)
-    }
-    return _modular_generico_tabela(bits, 1, tabela_bpsk)
-
-# Modulação QPSK: Mapeamento padrão de 2 bits por símbolo
-def _modular_qpsk(bits: list[int]) -> list[float]:
-    # Baseado no Slide CF-12, Pág 29
-    # Mapeamento de fase padrão
-    tabela_qpsk = {
-        (1, 1): (1.0, 45),
-        (1, 0): (1.0, 135),
-        (0, 0): (1.0, 225),
-        (0, 1): (1.0, 315)
-    }
-    return _modular_generico_tabela(bits, 2, tabela_qpsk)
-
-# Modulação 8PSK: Mapeamento padrão de 3 bits por símbolo
-def _modular_8psk(bits: list[int]) -> list[float]:
-    # Baseado no Slide CF-12, Pág 41 (Diagrama Visual)
-    # Amplitude 1.0 constante
-    tabela_8psk = {
-        (0, 0, 0): (1.0, 0),
-        (0, 0, 1): (1.0, 45),
-        (1, 0, 1): (1.0, 90),
-        (1, 1, 1): (1.0, 135),
-        (0, 1, 1): (1.0, 180),
-        (0, 1, 0): (1.0, 225),
-        (1, 1, 0): (1.0, 270),
-        (1, 0, 0): (1.0, 315)
-    }
-    return _modular_generico_tabela(bits, 3, tabela_8psk)
-
-# Modulação 16-QAM: Mapeamento padrão de 4 bits por símbolo
-def _modular_16qam(bits: list[int]) -> list[float]:
-    tabela_16qam = {
-        # Quadribit : (Amplitude, Fase)
-        (0, 0, 0, 0): (0.33, 225),
-        (0, 0, 0, 1): (0.75, 255),
-        (0, 0, 1, 0): (0.75, 195),
-        (0, 0, 1, 1): (1.00, 225),
-        (0, 1, 0, 0): (0.33, 135),
-        (0, 1, 0, 1): (0.75, 105),
-        (0, 1, 1, 0): (0.75, 165),
-        (0, 1, 1, 1): (1.00, 135),
-        (1, 0, 0, 0): (0.33, 315),
-        (1, 0, 0, 1): (0.75, 285),
-        (1, 0, 1, 0): (0.75, 345),
-        (1, 0, 1, 1): (1.00, 315),
-        (1, 1, 0, 0): (0.33, 45),
-        (1, 1, 0, 1): (0.75, 75),
-        (1, 1, 1, 0): (0.75, 15),
-        (1, 1, 1, 1): (1.00, 45)
-    }
-    return _modular_generico_tabela(bits, 4, tabela_16qam)
+def modular_portadora(bits: list[int], tipo: str, parametros: ParametrosFisicos = None) -> list[float]:
+    return modular_portadora_vetorial(bits, tipo, parametros).tolist()
+
+# mesma modulação, mas devolve um np.ndarray (tipo pode ser o nome ou o próprio Modem)
+def modular_portadora_vetorial(bits: list[int], tipo: str, parametros: ParametrosFisicos = None) -> np.ndarray:
+    return obter_modem(tipo).modular(np.asarray(bits, dtype=np.int8), _parametros(parametros))
 
 ################################################ Demodulação por portadora ##############################################
 
 # recebe o sinal amostrado e o tipo de modulação, retorna a lista de bits recuperados
-def demodular_portadora(sinal_amostrado: list[float], tipo: str) -> list[int]:
+def demodular_portadora(sinal_amostrado: list[float], tipo: str, parametros: ParametrosFisicos = None) -> list[int]:
+    return demodular_portadora_vetorial(sinal_amostrado, tipo, parametros).tolist()
+
+# mesma demodulação, mas devolve um np.ndarray de bits (tipo pode ser o nome ou o próprio Modem)
+def demodular_portadora_vetorial(sinal_amostrado: list[float], tipo: str, parametros: ParametrosFisicos = None) -> np.ndarray:
+    p = _parametros(parametros)
+    return obter_modem(tipo).demodular(np.asarray(sinal_amostrado, dtype=p.dtype), p)
+
+################################################ Modems (Registro de Modulações) #######################################
+
+# Converte os bits em índices de símbolo (grupos de tamanho_grupo, MSB primeiro)
+def _indices_simbolos(bits: np.ndarray, tamanho_grupo: int) -> np.ndarray:
+    # Preenche com 0 se faltar bits no último grupo (padding)
+    sobra = bits.shape[-1] % tamanho_grupo
+    if sobra:
+        bits = np.pad(bits, [(0, 0)] * (bits.ndim - 1) + [(0, tamanho_grupo - sobra)])
+    pesos = 1 << np.arange(tamanho_grupo - 1, -1, -1)
+    return bits.reshape(bits.shape[:-1] + (-1, tamanho_grupo)) @ pesos
+
+# Converte os índices de símbolo de volta em bits (MSB primeiro)
+def _bits_dos_simbolos(simbolos: np.ndarray, tamanho_grupo: int) -> np.ndarray:
+    deslocamentos = np.arange(tamanho_grupo - 1, -1, -1)
+    bits = (simbolos[..., np.newaxis] >> deslocamentos) & 1
+    return bits.astype(np.int8).reshape(simbolos.shape[:-1] + (-1,))
+
+# Código Gray de cada posição 0 .. n - 1 (posições vizinhas diferem em um único bit)
+def _codigos_gray(n: int) -> np.ndarray:
+    posicoes = np.arange(n)
+    return posicoes ^ (posicoes >> 1)
+
+# Bits (MSB primeiro) de um valor inteiro, como chave das tabelas de mapeamento
+def _grupo_de_bits(valor: int, tamanho_grupo: int) -> tuple:
+    return tuple(int(b) for b in format(valor, f'0{tamanho_grupo}b'))
+
+# Divide o sinal em uma matriz (símbolos x amostras_por_simbolo), descartando o bloco final incompleto
+# (num lote quadros x amostras, cada quadro vira a sua matriz: quadros x símbolos x amostras_por_simbolo)
+def _blocos_de_simbolos(sinal: np.ndarray, amostras_por_simbolo: int) -> np.ndarray:
+    n_simbolos = sinal.shape[-1] // amostras_por_simbolo
+    return sinal[..., :n_simbolos * amostras_por_simbolo].reshape(sinal.shape[:-1] + (n_simbolos, amostras_por_simbolo))
+
+class Modem:
+    """
+    Modulação por portadora pré-compilada. Guarda as tabelas e, em cache, as formas de onda e referências
+    de cada conjunto de ParametrosFisicos, então modular/demodular não reconstroem nada por chamada.
+    Subclasses definem _amostra (onda de um símbolo), demodular e o equivalente em banda base complexa (IQ).
+    """
+    nome = ''
+    bits_por_simbolo = 1
+    amostras_iq_por_simbolo = 1  # amostras complexas por símbolo no modo IQ
+
+    def __init__(self):
+        self._cache = {}
+
+    # devolve o valor guardado para o item, calculando-o na primeira vez com os parâmetros p
+    def _em_cache(self, item: str, p: ParametrosFisicos, calcular):
+        chave = (item,) + p.chave()
+        valor = self._cache.get(chave)
+        if valor is None:
+            valor = calcular()
+            self._cache[chave] = valor
+        return valor
+
+    # Matriz (símbolos x amostras): cada linha é a onda de um símbolo, indexada pelo valor do grupo de bits
+    def formas_de_onda(self, p: ParametrosFisicos) -> np.ndarray:
+        _verificar_nyquist(p.portadora_freq, p)
+        # _amostra(simbolo, t, p) usa as mesmas expressões do cálculo amostra a amostra
+        return self._em_cache('formas', p, lambda: np.array(
+            [[self._amostra(s, i / p.amostras_por_bit, p) for i in range(p.amostras_por_bit)]
+             for s in range(2 ** self.bits_por_simbolo)], dtype=p.dtype))
+
+    # uma cópia da onda pré-calculada por símbolo
+    def modular(self, bits: np.ndarray, p: ParametrosFisicos) -> np.ndarray:
+        simbolos = _indices_simbolos(bits, self.bits_por_simbolo)
+        return self.formas_de_onda(p)[simbolos].reshape(simbolos.shape[:-1] + (-1,))
+
+    def _amostra(self, simbolo: int, t: float, p: ParametrosFisicos) -> float:
+        raise NotImplementedError
+
+    def demodular(self, sinal: np.ndarray, p: ParametrosFisicos) -> np.ndarray:
+        raise NotImplementedError
+
+    def modular_iq(self, bits: np.ndarray, p: ParametrosFisicos) -> np.ndarray:
+        raise NotImplementedError
+
+    def demodular_iq(self, sinal_iq: np.ndarray, p: ParametrosFisicos) -> np.ndarray:
+        raise NotImplementedError
+
+class ModemASK(Modem):
+    """ASK: Bit 1 -> Onda senoidal com amplitude A, Bit 0 -> Amplitude 0"""
+    nome = 'ASK'
+
+    def _amostra(self, simbolo, t, p):
+        amp = p.amplitude if simbolo == 1 else 0.0
+        return amp * math.sin(2 * math.pi * p.portadora_freq * t)
+
+    # Calcula a energia do sinal para decidir entre 0 e 1
+    def demodular(self, sinal, p):
+        # Calcula amplitude média absoluta de cada bloco de amostras_por_bit amostras (1 bit)
+        energia = np.abs(_blocos_de_simbolos(sinal, p.amostras_por_bit)).mean(axis=-1)
 
-    # transforma em maiúsculas
-    tipo = tipo.upper()
-    
-    # descobre o tipo e chama a função correta
-    if tipo == 'ASK':
-        return _demodular_ask(sinal_amostrado)
-    elif tipo == 'FSK':
-        return _demodular_fsk(sinal_amostrado)
-    elif tipo == 'BPSK':
-        # BPSK é 1 bit por símbolo 
-        tabela_bpsk = {
-            (0,): (1.0, 0), 
-            (1,): (1.0, 180)}
-        return _demodular_generico_tabela(sinal_amostrado, 1, tabela_bpsk)
-    elif tipo == 'QPSK':
-        # QPSK é 2 bits por símbolo
-        tabela_qpsk = {
-            (1, 1): (1.0, 45), (1, 0): (1.0, 135),
-            (0, 0): (1.0, 225), (0, 1): (1.0, 315)
-        }
-        return _demodular_generico_tabela(sinal_amostrado, 2, tabela_qpsk)
-    elif tipo == '8PSK':
-        # 8PSK é 3 bits por símbolo
-        tabela_8psk = {
-            (0, 0, 0): (1.0, 0), (0, 0, 1): (1.0, 45),
-            (1, 0, 1): (1.0, 90), (1, 1, 1): (1.0, 135),
-            (0, 1, 1): (1.0, 180), (0, 1, 0): (1.0, 225),
-            (1, 1, 0): (1.0, 270), (1, 0, 0): (1.0, 315)
-        }
-        return _demodular_generico_tabela(sinal_amostrado, 3, tabela_8psk)
-    elif tipo == '16-QAM':
-        # 16-QAM é 4 bits por símbolo
-        tabela_16qam = {
-             (0, 0, 0, 0): (0.33, 225), (0, 0, 0, 1): (0.75, 255),
-             (0, 0, 1, 0): (0.75, 195), (0, 0, 1, 1): (1.00, 225),
-             (0, 1, 0, 0): (0.33, 135), (0, 1, 0, 1): (0.75, 105),
-             (0, 1, 1, 0): (0.75, 165), (0, 1, 1, 1): (1.00, 135),
-             (1, 0, 0, 0): (0.33, 315), (1, 0, 0, 1): (0.75, 285),
-             (1, 0, 1, 0): (0.75, 345), (1, 0, 1, 1): (1.00, 315),
-             (1, 1, 0, 0): (0.33, 45),  (1, 1, 0, 1): (0.75, 75),
-             (1, 1, 1, 0): (0.75, 15),  (1, 1, 1, 1): (1.00, 45)
-        }
-        return _demodular_generico_tabela(sinal_amostrado, 4, tabela_16qam)
-    else:
-        raise ValueError(f"Demodulação desconhecida: {tipo}")
-
-# Demodulação ASK: Calcula a energia do sinal para decidir entre 0 e 1
-def _demodular_ask(sinal: list[float]) -> list[int]:
-    bits = []
-    # Percorre o sinal em blocos de 100 amostras (1 bit)
-    for i in range(0, len(sinal), AMOSTRAS_POR_BIT):
-        chunk = sinal[i : i + AMOSTRAS_POR_BIT]
-        if len(chunk) < AMOSTRAS_POR_BIT: break
-        
-        # Calcula amplitude média absoluta
-        energia = sum([abs(x) for x in chunk]) / len(chunk)
-        
         # Limiar de decisão: Metade da amplitude máxima (0.5 * 2/pi aprox para senoide)
-        # Ajuste empírico: 0.3 funciona bem para distinguir ruído de sinal
-        limiar = 0.3 
-        
-        bits.append(1 if energia > limiar else 0)
-    return bits
+        # Ajuste empírico: 0.3 (da amplitude) funciona bem para distinguir ruído de sinal
+        limiar = 0.3 * p.amplitude
+
+        return (energia > limiar).astype(np.int8)
+
+    def modular_iq(self, bits, p):
+        return np.where(bits == 1, p.amplitude, 0.0).astype(p.dtype_complexo)
+
+    # mesmo limiar de metade da amplitude do decisor analógico
+    def demodular_iq(self, sinal_iq, p):
+        return (sinal_iq.real > p.amplitude / 2).astype(np.int8)
 
-def _demodular_fsk(sinal: list[float]) -> list[int]:
+class ModemFSK(Modem):
     """
-    Demodula FSK usando Correlação.
-    Compara o sinal recebido com as duas frequências esperadas (f1 e f2).
-    Vê qual "casa" melhor.
+    FSK com n_tons tons: cada grupo de log2(n_tons) bits escolhe um tom.
+    O símbolo s usa (s + 1) * portadora_freq (no FSK binário, bit 0 -> f e bit 1 -> 2f).
     """
-    bits = []
-    f1 = PORTADORA_FREQ * 2 # Frequência do bit 1
-    f2 = PORTADORA_FREQ     # Frequência do bit 0
-    
-    for i in range(0, len(sinal), AMOSTRAS_POR_BIT):
-        chunk = sinal[i : i + AMOSTRAS_POR_BIT]
-        if len(chunk) < AMOSTRAS_POR_BIT: break
-        
-        correlacao_f1 = 0
-        correlacao_f2 = 0
-        
-        for j in range(len(chunk)):
-            t = j / AMOSTRAS_POR_BIT
-            # Multiplica sinal recebido pela onda de referência f1
-            correlacao_f1 += chunk[j] * math.sin(2 * math.pi * f1 * t)
-            # Multiplica sinal recebido pela onda de referência f2
-            correlacao_f2 += chunk[j] * math.sin(2 * math.pi * f2 * t)
-            
+
+    def __init__(self, nome: str, n_tons: int):
+        super().__init__()
+        self.nome = nome
+        self.n_tons = n_tons
+        self.bits_por_simbolo = n_tons.bit_length() - 1
+        # no modo IQ: 2 amostras por tom, os tons ficam ortogonais dentro do símbolo
+        self.amostras_iq_por_simbolo = 2 * n_tons
+        n = np.arange(self.amostras_iq_por_simbolo)
+        self._tons_iq = np.exp(2j * np.pi * np.outer(np.arange(1, n_tons + 1), n) / self.amostras_iq_por_simbolo)
+
+    def frequencias(self, p: ParametrosFisicos) -> list[float]:
+        frequencias = [p.portadora_freq * (s + 1) for s in range(self.n_tons)]
+        # Acima de metade da taxa de amostragem os tons se confundem (aliasing)
+        if frequencias[-1] >= p.amostras_por_bit / 2:
+            raise ValueError(f"{self.n_tons} tons de FSK passam da frequência de Nyquist com {p.amostras_por_bit} amostras por símbolo")
+        return frequencias
+
+    def formas_de_onda(self, p):
+        self.frequencias(p)
+        return super().formas_de_onda(p)
+
+    def _amostra(self, simbolo, t, p):
+        freq = p.portadora_freq * (simbolo + 1)
+        return p.amplitude * math.sin(2 * math.pi * freq * t)
+
+    # Referências sen(2*pi*f*t) de um período de símbolo, uma coluna por tom
+    def referencias(self, p: ParametrosFisicos) -> np.ndarray:
+        def calcular():
+            t = np.arange(p.amostras_por_bit) / p.amostras_por_bit
+            return np.sin(2 * np.pi * np.outer(t, self.frequencias(p))).astype(p.dtype)
+        return self._em_cache('referencias', p, calcular)
+
+    def demodular(self, sinal, p):
+        """
+        Demodula FSK usando Correlação: compara todos os símbolos com as referências pré-calculadas
+        de uma vez (símbolos x amostras @ amostras x tons) e vê qual "casa" melhor.
+        """
+        correlacoes = _blocos_de_simbolos(sinal, p.amostras_por_bit) @ self.referencias(p)
+
         # Quem tiver maior correlação ganha (usamos abs para ignorar fase inicial por enquanto)
-        if abs(correlacao_f1) > abs(correlacao_f2):
-            bits.append(1)
-        else:
-            bits.append(0)
-    return bits
+        # Em empate vence o primeiro tom, como no FSK binário (bit 0)
+        simbolos = np.argmax(np.abs(correlacoes), axis=-1)
+        return _bits_dos_simbolos(simbolos, self.bits_por_simbolo)
 
-def _demodular_generico_tabela(sinal: list[float], bits_por_simbolo: int, tabela: dict) -> list[int]:
+    def modular_iq(self, bits, p):
+        simbolos = _indices_simbolos(bits, self.bits_por_simbolo)
+        tons = self._tons_iq[simbolos].reshape(simbolos.shape[:-1] + (-1,))
+        return (p.amplitude * tons).astype(p.dtype_complexo)
+
+    # correlação coerente com cada tom; vence a maior (em empate, o primeiro tom)
+    def demodular_iq(self, sinal_iq, p):
+        blocos = _blocos_de_simbolos(sinal_iq, self.amostras_iq_por_simbolo)
+        correlacoes = (blocos @ self._tons_iq.conj().T).real
+        simbolos = np.argmax(np.abs(correlacoes), axis=-1)
+        return _bits_dos_simbolos(simbolos, self.bits_por_simbolo)
+
+class ModemTabela(Modem):
     """
-    Demodulador Genérico para PSK e QAM.
-    1. Extrai Amplitude e Fase do símbolo recebido.
-    2. Compara com a tabela ideal.
-    3. Escolhe a opção mais próxima (Menor Distância Euclidiana).
+    Modulação genérica por tabela (PSK e QAM): cada grupo de bits vira (fator de amplitude, fase em graus).
+    A constelação complexa é calculada uma única vez, na criação do modem.
     """
-    bits_recuperados = []
-    
-    for i in range(0, len(sinal), AMOSTRAS_POR_BIT):
-        chunk = sinal[i : i + AMOSTRAS_POR_BIT]
-        if len(chunk) < AMOSTRAS_POR_BIT: break
-        
-        # Passo 1: Extrair Componentes I (Cosseno) e Q (Seno) do sinal recebido
-        # Isso é matemática de Transformada de Fourier
-        soma_i = 0
-        soma_q = 0
-        for j in range(len(chunk)):
-            t = j / AMOSTRAS_POR_BIT
-            # Projeção I (In-Phase): Correlaciona com COS
-            soma_i += chunk[j] * math.cos(2 * math.pi * PORTADORA_FREQ * t)
-            
-            # CORREÇÃO PROJEÇÃO Q (Quadrature): Correlaciona com -SIN
-            # Isso garante que atan2(Q, I) devolva o ângulo correto
-            soma_q += chunk[j] * -1 * math.sin(2 * math.pi * PORTADORA_FREQ * t)
-        
+
+    def __init__(self, nome: str, tabela: dict):
+        super().__init__()
+        self.nome = nome
+        self.tabela = tabela
+        self.bits_por_simbolo = len(next(iter(tabela)))
+
+        # Converte a tabela (amplitude, fase) em pontos complexos x + jy, na ordem da tabela
+        amps = np.array([amp for amp, _ in tabela.values()], dtype=np.float64)
+        fases = np.radians([fase for _, fase in tabela.values()])
+        self.pontos = amps * np.exp(1j * fases)
+        self.grupos = np.array(list(tabela.keys()), dtype=np.int8)
+
+        # Os mesmos pontos indexados pelo valor inteiro do grupo de bits (para o modo IQ)
+        self.pontos_por_indice = np.ones(2 ** self.bits_por_simbolo, dtype=np.complex128)
+        pesos = 1 << np.arange(self.bits_por_simbolo - 1, -1, -1)
+        self.pontos_por_indice[self.grupos @ pesos] = self.pontos
+
+    def _amostra(self, simbolo, t, p):
+        grupo = _grupo_de_bits(simbolo, self.bits_por_simbolo)
+        amp_fator, fase_graus = self.tabela.get(grupo, (1.0, 0.0))
+        fase_rad = math.radians(fase_graus)
+        amplitude_final = p.amplitude * amp_fator
+        # CORREÇÃO: Usar math.cos para alinhar fase 0 com eixo X
+        return amplitude_final * math.cos(2 * math.pi * p.portadora_freq * t + fase_rad)
+
+    # Vetores de referência I (cos) e Q (-sen) de um período de símbolo
+    def base_iq(self, p: ParametrosFisicos) -> np.ndarray:
+        def calcular():
+            t = np.arange(p.amostras_por_bit) / p.amostras_por_bit
+            fase = 2 * np.pi * p.portadora_freq * t
+            return np.column_stack((np.cos(fase), -np.sin(fase))).astype(p.dtype)
+        return self._em_cache('base_iq', p, calcular)
+
+    def demodular(self, sinal, p):
+        """
+        Demodulador Genérico para PSK e QAM.
+        1. Extrai os componentes I e Q de todos os símbolos com uma multiplicação de matrizes.
+        2. Compara com a constelação ideal.
+        3. Escolhe a opção mais próxima (Menor Distância Euclidiana).
+        """
+        # Passo 1: Projeções I (cos) e Q (-sen) de todos os símbolos de uma vez
+        iq = _blocos_de_simbolos(sinal, p.amostras_por_bit) @ self.base_iq(p)
+
         # Normaliza para recuperar a amplitude original (fator 2/N devido à integral de seno^2)
-        amp_medida = (2 / AMOSTRAS_POR_BIT) * math.sqrt(soma_i**2 + soma_q**2)
-        
-        # Calcula a fase em graus (atan2 retorna radianos entre -pi e pi)
-        fase_rad = math.atan2(soma_q, soma_i) # Atenção: atan2(y, x) -> (seno, cosseno)
-        fase_graus_medida = math.degrees(fase_rad)
-        if fase_graus_medida < 0: fase_graus_medida += 360
-        
-        # Passo 2 e 3: Encontrar na tabela qual tupla de bits tem a menor distância
-        # para a (Amplitude, Fase) que acabamos de medir.
-        
-        melhor_grupo = None
-        menor_distancia = float('inf')
-        
-        for grupo_bits, (amp_ref, fase_ref) in tabela.items():
-            # Converter referência polar para retangular (x, y) para calcular distância real
-            # Referência
-            ref_rad = math.radians(fase_ref)
-            x_ref = amp_ref * math.cos(ref_rad)
-            y_ref = amp_ref * math.sin(ref_rad)
-            
-            # Medido
-            meas_rad = math.radians(fase_graus_medida)
-            x_meas = amp_medida * math.cos(meas_rad)
-            y_meas = amp_medida * math.sin(meas_rad)
-            
-            # Distância Euclidiana
-            dist = math.sqrt((x_ref - x_meas)**2 + (y_ref - y_meas)**2)
-            
-            if dist < menor_distancia:
-                menor_distancia = dist
-                melhor_grupo = grupo_bits
-        
-        # Adiciona os bits encontrados à lista final
-        if melhor_grupo:
-            bits_recuperados.extend(melhor_grupo)
-            
-    return bits_recuperados
+        medidos = (2 / p.amostras_por_bit) * (iq[..., 0] + 1j * iq[..., 1])
+        return self._decidir(medidos, p)
+
+    # Passo 2 e 3: distância de cada símbolo medido a cada ponto da constelação (símbolos x pontos)
+    def _decidir(self, medidos: np.ndarray, p: ParametrosFisicos) -> np.ndarray:
+        pontos = p.amplitude * self.pontos
+        distancias = np.abs(medidos[..., np.newaxis] - pontos)
+        melhores = np.argmin(distancias, axis=-1)
+
+        # Concatena os bits dos pontos escolhidos
+        return self.grupos[melhores].reshape(melhores.shape[:-1] + (-1,))
+
+    def modular_iq(self, bits, p):
+        pontos = self.pontos_por_indice[_indices_simbolos(bits, self.bits_por_simbolo)]
+        return (p.amplitude * pontos).astype(p.dtype_complexo)
+
+    def demodular_iq(self, sinal_iq, p):
+        return self._decidir(sinal_iq, p)
+
+class ModemQAM(ModemTabela):
+    """
+    M-QAM quadrada com mapeamento Gray em cada eixo (16, 64, 256...): a primeira metade dos bits escolhe o
+    nível de I e a segunda o de Q, com os cantos na amplitude 1.0 (como em TABELA_16QAM). O decisor arredonda
+    cada eixo para o nível mais próximo, em tempo constante por símbolo, sem percorrer a constelação.
+    """
+
+    def __init__(self, nome: str, ordem: int):
+        self.bits_por_eixo = (ordem.bit_length() - 1) // 2
+        if ordem < 4 or 4 ** self.bits_por_eixo != ordem:
+            raise ValueError(f"QAM quadrada precisa de uma ordem potência de 4 (recebido {ordem})")
+        self.niveis_por_eixo = 2 ** self.bits_por_eixo
+
+        # nível (0 .. L-1) -> código Gray e o inverso
+        self._gray_do_nivel = _codigos_gray(self.niveis_por_eixo)
+        self._nivel_do_gray = np.argsort(self._gray_do_nivel)
+
+        # coordenadas ímpares -(L-1) .. L-1 em cada eixo, escaladas para o canto ficar com amplitude 1.0
+        self.escala = 1 / ((self.niveis_por_eixo - 1) * math.sqrt(2))
+
+        tabela = {}
+        for simbolo in range(ordem):
+            nivel_i = self._nivel_do_gray[simbolo >> self.bits_por_eixo]
+            nivel_q = self._nivel_do_gray[simbolo & (self.niveis_por_eixo - 1)]
+            ponto = complex(2 * nivel_i - self.niveis_por_eixo + 1, 2 * nivel_q - self.niveis_por_eixo + 1) * self.escala
+            tabela[_grupo_de_bits(simbolo, 2 * self.bits_por_eixo)] = (abs(ponto), math.degrees(np.angle(ponto)))
+        super().__init__(nome, tabela)
+
+    # Nível mais próximo em um eixo: arredonda a coordenada e corta nas bordas da constelação
+    def _nivel_no_eixo(self, coordenada: np.ndarray) -> np.ndarray:
+        nivel = np.rint((coordenada + self.niveis_por_eixo - 1) / 2)
+        return np.clip(nivel, 0, self.niveis_por_eixo - 1).astype(np.intp)
+
+    def _decidir(self, medidos, p):
+        medidos = medidos / (p.amplitude * self.escala)
+        gray_i = self._gray_do_nivel[self._nivel_no_eixo(medidos.real)]
+        gray_q = self._gray_do_nivel[self._nivel_no_eixo(medidos.imag)]
+        return _bits_dos_simbolos((gray_i << self.bits_por_eixo) | gray_q, self.bits_por_simbolo)
+
+class ModemPSK(ModemTabela):
+    """
+    M-PSK com mapeamento Gray: a posição k do círculo (fase 360 * k / M graus, amplitude 1.0) carrega o código
+    Gray de k, então setores vizinhos diferem em um bit. O decisor quantiza a fase medida no setor mais próximo.
+    """
+
+    def __init__(self, nome: str, ordem: int):
+        if ordem < 2 or ordem & (ordem - 1):
+            raise ValueError(f"PSK precisa de uma ordem potência de 2 (recebido {ordem})")
+        self.ordem = ordem
+        self._gray_da_posicao = _codigos_gray(ordem)
+        posicao_do_gray = np.argsort(self._gray_da_posicao)
+
+        bits_por_simbolo = ordem.bit_length() - 1
+        tabela = {_grupo_de_bits(simbolo, bits_por_simbolo): (1.0, 360 * posicao_do_gray[simbolo] / ordem)
+                  for simbolo in range(ordem)}
+        super().__init__(nome, tabela)
+
+    def _decidir(self, medidos, p):
+        posicao = np.rint(np.angle(medidos) * self.ordem / (2 * np.pi)).astype(np.intp) % self.ordem
+        return _bits_dos_simbolos(self._gray_da_posicao[posicao], self.bits_por_simbolo)
+
+# Registro: nome da modulação (maiúsculas) -> Modem
+_MODEMS = {}
 
-# ... (Mantenha todo o código anterior de imports e modulações digitais)
+# registra um modem (inclusive de terceiros) para ser usado pelo nome em todas as funções da camada física
+def registrar_modem(modem: Modem) -> Modem:
+    _MODEMS[modem.nome.upper()] = modem
+    return modem
+
+# recebe o nome da modulação (ou um Modem, devolvido como está) e retorna o Modem registrado
+def obter_modem(tipo) -> Modem:
+    if isinstance(tipo, Modem):
+        return tipo
+    modem = _MODEMS.get(tipo.upper())
+    if modem is None:
+        raise ValueError(f"Modulação desconhecida: {tipo}")
+    return modem
+
+# nomes das modulações registradas, na ordem de registro
+def modems_registrados() -> list[str]:
+    return list(_MODEMS)
+
+registrar_modem(ModemASK())
+registrar_modem(ModemFSK('FSK', 2))
+registrar_modem(ModemFSK('4FSK', 4))
+# 8FSK não é registrado: com a portadora e as amostras padrão o tom mais alto passa da frequência de Nyquist.
+# Com parâmetros que o comportem: registrar_modem(ModemFSK('8FSK', 8)).
+registrar_modem(ModemTabela('BPSK', TABELA_BPSK))
+registrar_modem(ModemTabela('QPSK', TABELA_QPSK))
+registrar_modem(ModemTabela('8PSK', TABELA_8PSK))
+registrar_modem(ModemTabela('16-QAM', TABELA_16QAM))
+registrar_modem(ModemPSK('16PSK', 16))
+registrar_modem(ModemPSK('32PSK', 32))
+registrar_modem(ModemQAM('64-QAM', 64))
+registrar_modem(ModemQAM('256-QAM', 256))
 
 ################################################### Modulação Analógica (Sinal -> Portadora) ###########################
 
-def modular_sinal_analogico(sinal_bb: list[float], tipo_modulacao_bb: str, tipo_portadora: str) -> list[float]:
+# Modulações lineares: a portadora leva a própria forma de onda da codificação de linha (mixer + filtro passa-baixa
+# na recepção); nas demais a codificação de linha volta a bits antes do modem
+MODULACOES_LINEARES = ('ASK', 'BPSK')
+
+# Portadora contínua sen(2*pi*f*t), com t = i / amostras_por_bit para i = inicio .. inicio + n - 1
+def _portadora_continua(n: int, p: ParametrosFisicos, inicio: int = 0) -> np.ndarray:
+    _verificar_nyquist(p.portadora_freq, p)
+    t = np.arange(inicio, inicio + n) / p.amostras_por_bit
+    return np.sin(2 * np.pi * p.portadora_freq * t).astype(p.dtype)
+
+def modular_sinal_analogico(sinal_bb: list[float], tipo_modulacao_bb: str, tipo_portadora: str,
+                            parametros: ParametrosFisicos = None) -> list[float]:
     """
     Recebe um SINAL DE BANDA BASE (tensões) e o modula em uma portadora.
     """
-    tipo_portadora = tipo_portadora.upper()
-    sinal_modulado = []
+    return modular_sinal_analogico_vetorial(sinal_bb, tipo_modulacao_bb, tipo_portadora, parametros).tolist()
+
+def modular_sinal_analogico_vetorial(sinal_bb: list[float], tipo_modulacao_bb: str, tipo_portadora: str,
+                                     parametros: ParametrosFisicos = None) -> np.ndarray:
+    """
+    Mesma modulação de modular_sinal_analogico, mas devolve um np.ndarray.
+    """
+    p = _parametros(parametros)
+    modem = obter_modem(tipo_portadora)
+    sinal_bb = np.asarray(sinal_bb, dtype=p.dtype)
     
     # Caso 1: Modulação ASK (Amplitude Shift Keying)
     # Correção: Para garantir o efeito visual "Liga/Desliga", ignoramos voltagens negativas.
-    if tipo_portadora == 'ASK':
-        for i, voltagem in enumerate(sinal_bb):
-            t = i / AMOSTRAS_POR_BIT
-            # Se voltagem > 0 mantém, se for negativa/zero vira 0.0 (Silêncio)
-            amplitude = voltagem if voltagem > 0 else 0.0
-            val = amplitude * math.sin(2 * math.pi * PORTADORA_FREQ * t)
-            sinal_modulado.append(val)
-        return sinal_modulado
+    if modem.nome == 'ASK':
+        # Se voltagem > 0 mantém, se for negativa/zero vira 0.0 (Silêncio)
+        amplitude = np.where(sinal_bb > 0, sinal_bb, 0)
+        return amplitude * _portadora_continua(sinal_bb.shape[-1], p)
 
     # Caso 2: Modulação BPSK (Binary Phase Shift Keying)
     # Aqui a voltagem negativa DEVE inverter a fase (multiplicação direta)
-    elif tipo_portadora == 'BPSK':
-        for i, voltagem in enumerate(sinal_bb):
-            t = i / AMOSTRAS_POR_BIT
-            # Multiplicação direta: +V vira seno, -V vira -seno (fase oposta)
-            val = voltagem * math.sin(2 * math.pi * PORTADORA_FREQ * t)
-            sinal_modulado.append(val)
-        return sinal_modulado
-
-    # Caso 3: Modulações Complexas (FSK, QPSK, QAM)
+    elif modem.nome == 'BPSK':
+        # Multiplicação direta: +V vira seno, -V vira -seno (fase oposta)
+        return sinal_bb * _portadora_continua(sinal_bb.shape[-1], p)
+
+    # Caso 3: Modulações Complexas (FSK, M-FSK, QPSK, QAM)
     # Usa a lógica de símbolos
     else:
-        bits_temp = decodificar_banda_base(sinal_bb, tipo_modulacao_bb)
-        return modular_portadora(bits_temp, tipo_portadora)
+        bits_temp = decodificar_banda_base_vetorial(sinal_bb, tipo_modulacao_bb, p)
+        return modem.modular(bits_temp, p)
 
 ################################################### Demodulação Analógica (Portadora -> Sinal) #########################
 
-def demodular_sinal_analogico(sinal_modulado: list[float], tipo_modulacao_bb: str, tipo_portadora: str) -> list[float]:
+def demodular_sinal_analogico(sinal_modulado: list[float], tipo_modulacao_bb: str, tipo_portadora: str,
+                              filtro: str = 'MEDIA-MOVEL', parametros: ParametrosFisicos = None) -> list[float]:
     """
     Recebe um SINAL MODULADO e recupera o SINAL DE BANDA BASE (Tensão).
     """
-    tipo_portadora = tipo_portadora.upper()
+    return demodular_sinal_analogico_vetorial(sinal_modulado, tipo_modulacao_bb, tipo_portadora, filtro, parametros).tolist()
+
+def demodular_sinal_analogico_vetorial(sinal_modulado: list[float], tipo_modulacao_bb: str, tipo_portadora: str,
+                                       filtro: str = 'MEDIA-MOVEL', parametros: ParametrosFisicos = None) -> np.ndarray:
+    """
+    Mesma demodulação de demodular_sinal_analogico, mas devolve um np.ndarray.
+    O filtro passa-baixa das modulações lineares pode ser 'MEDIA-MOVEL' (padrão) ou 'FIR'.
+    """
+    p = _parametros(parametros)
+    modem = obter_modem(tipo_portadora)
+    sinal_modulado = np.asarray(sinal_modulado, dtype=p.dtype)
     
     # Caso 1: Modulações Lineares (ASK, BPSK)
-    if tipo_portadora in ['ASK', 'BPSK']:
-        sinal_recuperado = []
-        
-        # 1. Multiplicação pela Portadora (Mixer Síncrono)
-        for i, amostra in enumerate(sinal_modulado):
-            t = i / AMOSTRAS_POR_BIT
-            # Síncrono: sinal * sen(wt)
-            val = amostra * math.sin(2 * math.pi * PORTADORA_FREQ * t)
-            sinal_recuperado.append(val * 2) 
+    if modem.nome in MODULACOES_LINEARES:
+        # 1. Multiplicação pela Portadora (Mixer Síncrono): sinal * sen(wt)
+        sinal_recuperado = sinal_modulado * _portadora_continua(sinal_modulado.shape[-1], p) * 2
             
-        # 2. Filtro Passa-Baixa (Média Móvel)
-        janela = int(AMOSTRAS_POR_BIT / 2)
-        sinal_filtrado = []
-        tam = len(sinal_recuperado)
-        for i in range(tam):
-            inicio = max(0, i - janela)
-            fim = min(tam, i + janela)
-            media = sum(sinal_recuperado[inicio:fim]) / (fim - inicio)
-            sinal_filtrado.append(media)
+        # 2. Filtro Passa-Baixa
+        sinal_filtrado = filtrar_passa_baixa(sinal_recuperado, filtro, p)
             
         # 3. REGENERAÇÃO DE SINAL (DECISOR) - CORREÇÃO DO ERRO
         # O NRZ-Polar precisa de +V e -V. O ASK devolve +V e 0V.
-        # Vamos forçar o sinal para +1.0 ou -1.0 baseados num limiar.
-        sinal_final = []
-        limiar = 0.5 # Metade da amplitude
-        
-        # Detecta se precisamos regenerar para polar (Bipolar/NRZ-Polar) ou manter 0 (Unipolar)
-        # Assumiremos regeneração para polar (-1 a 1) para garantir robustez no ASK
-        for amostra in sinal_filtrado:
-            if tipo_portadora == 'ASK':
-                # No ASK: Energia (>0.5) é bit 1 (+V), Sem Energia (<0.5) é bit 0 (-V para NRZ-Polar)
-                if amostra > limiar:
-                    sinal_final.append(1.0)
-                else:
-                    sinal_final.append(-1.0) # Força o -1V para o decodificador NRZ funcionar bem
-            else:
-                # No BPSK: O sinal já vem positivo e negativo naturalmente, apenas repassa (ou limpa ruído)
-                sinal_final.append(amostra)
-                
-        return sinal_final
-
-    # Caso 2: Modulações Complexas (FSK, QPSK, QAM)
+        # Vamos forçar o sinal para +V ou -V baseados num limiar.
+        return _regenerar_ask(sinal_filtrado, p) if modem.nome == 'ASK' else sinal_filtrado
+
+    # Caso 2: Modulações Complexas (FSK, M-FSK, QPSK, QAM)
     else:
-        bits_recuperados = demodular_portadora(sinal_modulado, tipo_portadora)
-        return codificar_banda_base(bits_recuperados, tipo_modulacao_bb)
\ No newline at end of file
+        bits_recuperados = modem.demodular(sinal_modulado, p)
+        return codificar_banda_base_vetorial(bits_recuperados, tipo_modulacao_bb, p)
+
+# No ASK: Energia (> metade da voltagem) é bit 1 (+V), Sem Energia é bit 0 (-V para NRZ-Polar)
+# No BPSK o sinal já vem positivo e negativo naturalmente e é apenas repassado
+def _regenerar_ask(sinal_filtrado: np.ndarray, p: ParametrosFisicos) -> np.ndarray:
+    limiar = p.voltagem / 2 # Metade da amplitude
+    return np.where(sinal_filtrado > limiar, p.voltagem, -p.voltagem).astype(p.dtype)
+
+################################################### Filtros Passa-Baixa ##############################################
+
+# recebe o sinal e o nome do filtro, retorna o sinal filtrado (mesmo tamanho)
+def filtrar_passa_baixa(sinal: np.ndarray, tipo: str = 'MEDIA-MOVEL', parametros: ParametrosFisicos = None) -> np.ndarray:
+    p = _parametros(parametros)
+    tipo = tipo.upper()
+    if tipo == 'MEDIA-MOVEL':
+        return _filtrar_media_movel(sinal, p)
+    elif tipo == 'FIR':
+        return _filtrar_fir(sinal, p)
+    else:
+        raise ValueError(f"Filtro passa-baixa desconhecido: {tipo}")
+
+# Média Móvel com soma acumulada: média de sinal[i - janela : i + janela] (cortada nas bordas) em O(N)
+def _filtrar_media_movel(sinal: np.ndarray, p: ParametrosFisicos) -> np.ndarray:
+    janela = int(p.amostras_por_bit / 2)
+    tam = sinal.shape[-1]
+
+    # soma_acumulada[k] = soma de sinal[:k], então a soma de uma janela é a diferença de duas posições
+    # (acumulada em float64 mesmo com amostras float32, para não perder precisão em sinais longos)
+    zeros = np.zeros(sinal.shape[:-1] + (1,))
+    soma_acumulada = np.concatenate((zeros, np.cumsum(sinal, axis=-1, dtype=np.float64)), axis=-1)
+    indices = np.arange(tam)
+    inicio = np.maximum(0, indices - janela)
+    fim = np.minimum(tam, indices + janela)
+    return ((soma_acumulada[..., fim] - soma_acumulada[..., inicio]) / (fim - inicio)).astype(p.dtype)
+
+# FIR passa-baixa (sinc janelado por Hamming) com corte na frequência da portadora, ganho unitário em DC
+def _coeficientes_fir(p: ParametrosFisicos) -> np.ndarray:
+    meia_janela = int(p.amostras_por_bit / 2)
+    n = np.arange(-meia_janela, meia_janela + 1)
+    corte = p.portadora_freq / p.amostras_por_bit  # ciclos por amostra
+    coeficientes = np.sinc(2 * corte * n) * np.hamming(len(n))
+    return (coeficientes / coeficientes.sum()).astype(p.dtype)
+
+# Convolução centrada, considerando o sinal nulo fora das bordas
+def _filtrar_fir(sinal: np.ndarray, p: ParametrosFisicos) -> np.ndarray:
+    coeficientes = _coeficientes_fir(p)
+    meia_janela = len(coeficientes) // 2
+    if sinal.shape[-1] == 0:  # sem amostras: o pad + 'valid' abaixo devolveria amostras que não existem
+        return np.empty_like(sinal)
+    if sinal.ndim == 1:
+        return np.convolve(np.pad(sinal, meia_janela), coeficientes, mode='valid')
+
+    # lote de quadros: janelas deslizantes de cada quadro (sem cópia) vezes os coeficientes invertidos
+    preenchido = np.pad(sinal, [(0, 0)] * (sinal.ndim - 1) + [(meia_janela, meia_janela)])
+    janelas = np.lib.stride_tricks.sliding_window_view(preenchido, len(coeficientes), axis=-1)
+    return janelas @ coeficientes[::-1]
+
+################################################### Fluxo Contínuo (Streaming) #######################################
+
+# Os objetos abaixo recebem os dados em blocos de qualquer tamanho (processar) e devolvem as amostras/bits
+# já prontos, guardando entre chamadas o estado que atravessa a fronteira dos blocos. finalizar() esvazia o
+# que sobrou. A concatenação das saídas é igual à da função equivalente aplicada ao sinal inteiro.
+
+# Gera as saídas de um processador de fluxo para uma sequência de blocos de entrada
+def processar_em_fluxo(processador, blocos):
+    for bloco in blocos:
+        saida = processador.processar(bloco)
+        if len(saida):
+            yield saida
+    saida = processador.finalizar()
+    if len(saida):
+        yield saida
+
+class CodificadorBandaBase:
+    """Codificação de banda base em fluxo: mantém a polaridade do Bipolar (AMI) entre blocos."""
+
+    def __init__(self, tipo: str, parametros: ParametrosFisicos = None):
+        self.tipo = tipo.upper()
+        if self.tipo not in ('NRZ-POLAR', 'MANCHESTER', 'BIPOLAR'):
+            raise ValueError(f"Tipo de modulação banda base desconhecido: {tipo}")
+        self.parametros = _parametros(parametros)
+        self.uns_transmitidos = 0
+
+    def processar(self, bits: list[int]) -> np.ndarray:
+        bits = np.asarray(bits, dtype=np.int8)
+        if self.tipo == 'BIPOLAR':
+            sinal = _codificar_bipolar(bits, self.parametros, self.uns_transmitidos)
+            self.uns_transmitidos += int(np.count_nonzero(bits))
+            return sinal
+        return codificar_banda_base_vetorial(bits, self.tipo, self.parametros)
+
+    def finalizar(self) -> np.ndarray:
+        return np.empty(0, dtype=self.parametros.dtype)
+
+class DecodificadorBandaBase:
+    """Decodificação de banda base em fluxo: guarda as amostras de um bit incompleto até o próximo bloco."""
+
+    def __init__(self, tipo: str, parametros: ParametrosFisicos = None):
+        self.tipo = tipo.upper()
+        if self.tipo not in ('NRZ-POLAR', 'MANCHESTER', 'BIPOLAR'):
+            raise ValueError(f"Tipo de decodificação banda base desconhecido: {tipo}")
+        self.parametros = _parametros(parametros)
+        self._pendente = np.empty(0, dtype=self.parametros.dtype)
+
+    def processar(self, amostras: list[float]) -> np.ndarray:
+        p = self.parametros
+        sinal = np.concatenate((self._pendente, np.asarray(amostras, dtype=p.dtype)))
+        completos = len(sinal) // p.amostras_por_bit * p.amostras_por_bit
+        self._pendente = sinal[completos:]
+        return decodificar_banda_base_vetorial(sinal[:completos], self.tipo, p)
+
+    def finalizar(self) -> np.ndarray:
+        # a cauda incompleta recebe o mesmo tratamento de decodificar_banda_base
+        cauda, self._pendente = self._pendente, np.empty(0, dtype=self.parametros.dtype)
+        return decodificar_banda_base_vetorial(cauda, self.tipo, self.parametros)
+
+class ModuladorPortadora:
+    """Modulação por portadora em fluxo: guarda os bits de um símbolo incompleto (QPSK, 8PSK, 16-QAM...)."""
+
+    def __init__(self, tipo: str, parametros: ParametrosFisicos = None):
+        self.modem = obter_modem(tipo)
+        self.parametros = _parametros(parametros)
+        self._pendente = np.empty(0, dtype=np.int8)
+
+    def processar(self, bits: list[int]) -> np.ndarray:
+        bits = np.concatenate((self._pendente, np.asarray(bits, dtype=np.int8)))
+        completos = len(bits) // self.modem.bits_por_simbolo * self.modem.bits_por_simbolo
+        self._pendente = bits[completos:]
+        return self.modem.modular(bits[:completos], self.parametros)
+
+    def finalizar(self) -> np.ndarray:
+        # o último símbolo é completado com zeros, como em _indices_simbolos
+        resto, self._pendente = self._pendente, np.empty(0, dtype=np.int8)
+        return self.modem.modular(resto, self.parametros)
+
+class DemoduladorPortadora:
+    """Demodulação por portadora em fluxo: guarda as amostras de um símbolo incompleto."""
+
+    def __init__(self, tipo: str, parametros: ParametrosFisicos = None):
+        self.modem = obter_modem(tipo)
+        self.parametros = _parametros(parametros)
+        self._pendente = np.empty(0, dtype=self.parametros.dtype)
+
+    def processar(self, amostras: list[float]) -> np.ndarray:
+        p = self.parametros
+        sinal = np.concatenate((self._pendente, np.asarray(amostras, dtype=p.dtype)))
+        completos = len(sinal) // p.amostras_por_bit * p.amostras_por_bit
+        self._pendente = sinal[completos:]
+        return self.modem.demodular(sinal[:completos], p)
+
+    def finalizar(self) -> np.ndarray:
+        # símbolo incompleto no final é descartado
+        self._pendente = np.empty(0, dtype=self.parametros.dtype)
+        return np.empty(0, dtype=np.int8)
+
+class ModuladorAnalogico:
+    """Versão em fluxo de modular_sinal_analogico: mantém o índice (fase) da portadora entre blocos."""
+
+    def __init__(self, tipo_modulacao_bb: str, tipo_portadora: str, parametros: ParametrosFisicos = None):
+        self.tipo_portadora = obter_modem(tipo_portadora).nome
+        self.parametros = _parametros(parametros)
+        self.amostra_atual = 0
+        if self.tipo_portadora not in MODULACOES_LINEARES:
+            # bits recuperados da banda base e modulados símbolo a símbolo
+            self._decodificador = DecodificadorBandaBase(tipo_modulacao_bb, self.parametros)
+            self._modulador = ModuladorPortadora(tipo_portadora, self.parametros)
+
+    def processar(self, sinal_bb: list[float]) -> np.ndarray:
+        sinal_bb = np.asarray(sinal_bb, dtype=self.parametros.dtype)
+        if self.tipo_portadora in MODULACOES_LINEARES:
+            portadora = _portadora_continua(len(sinal_bb), self.parametros, self.amostra_atual)
+            self.amostra_atual += len(sinal_bb)
+            if self.tipo_portadora == 'ASK':
+                return np.where(sinal_bb > 0, sinal_bb, 0) * portadora
+            return sinal_bb * portadora
+        return self._modulador.processar(self._decodificador.processar(sinal_bb))
+
+    def finalizar(self) -> np.ndarray:
+        if self.tipo_portadora in MODULACOES_LINEARES:
+            return np.empty(0, dtype=self.parametros.dtype)
+        bits = self._decodificador.finalizar()
+        return np.concatenate((self._modulador.processar(bits), self._modulador.finalizar()))
+
+class _FiltroPassaBaixaFluxo:
+    """
+    Filtro passa-baixa em fluxo. A saída i depende das amostras i - meia_janela .. i + meia_janela,
+    então ela só é emitida quando a amostra i + meia_janela chega (atraso de meia janela).
+    """
+
+    def __init__(self, tipo: str, parametros: ParametrosFisicos = None):
+        self.tipo = tipo.upper()
+        if self.tipo not in ('MEDIA-MOVEL', 'FIR'):
+            raise ValueError(f"Filtro passa-baixa desconhecido: {tipo}")
+        self.parametros = _parametros(parametros)
+        self.meia_janela = int(self.parametros.amostras_por_bit / 2)
+        self._buffer = np.empty(0, dtype=self.parametros.dtype)
+        self._inicio_buffer = 0  # índice global de _buffer[0]
+        self._proxima_saida = 0
+
+    def processar(self, amostras: np.ndarray, final: bool = False) -> np.ndarray:
+        self._buffer = np.concatenate((self._buffer, amostras))
+        fim = self._inicio_buffer + len(self._buffer)
+        limite = fim if final else max(self._proxima_saida, fim - self.meia_janela)
+
+        if self.tipo == 'MEDIA-MOVEL':
+            saida = self._media_movel(self._proxima_saida, limite, fim)
+        else:
+            saida = self._fir(self._proxima_saida, limite, final)
+        self._proxima_saida = limite
+
+        # descarta as amostras que nenhuma saída futura vai usar
+        descartar = max(0, self._proxima_saida - self.meia_janela - self._inicio_buffer)
+        self._buffer = self._buffer[descartar:]
+        self._inicio_buffer += descartar
+        return saida
+
+    def _media_movel(self, primeira: int, limite: int, fim: int) -> np.ndarray:
+        # mesma janela cortada nas bordas de _filtrar_media_movel, em índices globais
+        soma_acumulada = np.concatenate(([0.0], np.cumsum(self._buffer, dtype=np.float64)))
+        indices = np.arange(primeira, limite)
+        inicio = np.maximum(0, indices - self.meia_janela)
+        fim_janela = np.minimum(fim, indices + self.meia_janela)
+        somas = soma_acumulada[fim_janela - self._inicio_buffer] - soma_acumulada[inicio - self._inicio_buffer]
+        return (somas / (fim_janela - inicio)).astype(self.parametros.dtype)
+
+    def _fir(self, primeira: int, limite: int, final: bool) -> np.ndarray:
+        if limite <= primeira:
+            return np.empty(0, dtype=self.parametros.dtype)
+        # trecho primeira - meia_janela .. limite + meia_janela, com zeros antes do início e depois do fim
+        zeros_antes = max(0, self.meia_janela - (primeira - self._inicio_buffer))
+        trecho = self._buffer[max(0, primeira - self.meia_janela - self._inicio_buffer):]
+        trecho = np.pad(trecho, (zeros_antes, self.meia_janela if final else 0))
+        trecho = trecho[:limite - primeira + 2 * self.meia_janela]
+        return np.convolve(trecho, _coeficientes_fir(self.parametros), mode='valid')
+
+class DemoduladorAnalogico:
+    """Versão em fluxo de demodular_sinal_analogico: mantém a fase do mixer e a janela do filtro entre blocos."""
+
+    def __init__(self, tipo_modulacao_bb: str, tipo_portadora: str, filtro: str = 'MEDIA-MOVEL',
+                 parametros: ParametrosFisicos = None):
+        self.tipo_portadora = obter_modem(tipo_portadora).nome
+        self.parametros = _parametros(parametros)
+        self.amostra_atual = 0
+        if self.tipo_portadora in MODULACOES_LINEARES:
+            self._filtro = _FiltroPassaBaixaFluxo(filtro, self.parametros)
+        else:
+            # bits recuperados da portadora e recodificados em banda base (com o estado do AMI)
+            self._demodulador = DemoduladorPortadora(tipo_portadora, self.parametros)
+            self._codificador = CodificadorBandaBase(tipo_modulacao_bb, self.parametros)
+
+    def processar(self, sinal_modulado: list[float]) -> np.ndarray:
+        sinal_modulado = np.asarray(sinal_modulado, dtype=self.parametros.dtype)
+        if self.tipo_portadora in MODULACOES_LINEARES:
+            portadora = _portadora_continua(len(sinal_modulado), self.parametros, self.amostra_atual)
+            self.amostra_atual += len(sinal_modulado)
+            return self._decidir(self._filtro.processar(sinal_modulado * portadora * 2))
+        return self._codificador.processar(self._demodulador.processar(sinal_modulado))
+
+    def finalizar(self) -> np.ndarray:
+        if self.tipo_portadora in MODULACOES_LINEARES:
+            return self._decidir(self._filtro.processar(np.empty(0, dtype=self.parametros.dtype), final=True))
+        return self._codificador.processar(self._demodulador.finalizar())
+
+    def _decidir(self, sinal_filtrado: np.ndarray) -> np.ndarray:
+        if self.tipo_portadora == 'ASK':
+            return _regenerar_ask(sinal_filtrado, self.parametros)
+        return sinal_filtrado
+
+################################################### Banda Base Complexa (IQ) #########################################
+
+# Em vez de gerar amostras_por_bit amostras reais da portadora por símbolo, o modo IQ representa cada símbolo
+# pelo seu ponto complexo (envoltória complexa). O ruído é aplicado direto nesse domínio, com a variância que o
+# correlator do receptor de portadora (Modem.demodular) veria, então as decisões de bits do FSK, PSK e QAM são
+# estatisticamente equivalentes às da portadora amostrada, com qualquer codificação de linha (ela volta a bits
+# antes do modem). Não vale para as MODULACOES_LINEARES: na portadora amostrada elas transmitem a forma de onda
+# da codificação de linha (o ASK corta os níveis negativos do Bipolar) e a recepção usa mixer e filtro de média
+# móvel, com interferência entre bits vizinhos; por isso o Simulador não aceita o modo IQ com ASK e BPSK.
+
+# recebe os bits e o tipo de modulação, retorna as amostras complexas (uma por símbolo, ou 2 por tom no FSK)
+def modular_iq(bits: list[int], tipo: str, parametros: ParametrosFisicos = None) -> np.ndarray:
+    return obter_modem(tipo).modular_iq(np.asarray(bits, dtype=np.int8), _parametros(parametros))
+
+# Soma ruído gaussiano complexo equivalente a um ruído real de desvio sigma em cada amostra da portadora
+def adicionar_ruido_iq(sinal_iq: np.ndarray, sigma: float, tipo: str, rng: np.random.Generator = None,
+                       parametros: ParametrosFisicos = None) -> np.ndarray:
+    if sigma <= 0: return sinal_iq
+    if rng is None: rng = np.random.default_rng()
+    p = _parametros(parametros)
+
+    # o correlator soma amostras_por_bit amostras e normaliza por 2/N: cada componente fica com
+    # desvio sigma * sqrt(2 / N); no FSK a energia do símbolo se divide entre as L amostras complexas
+    sigma_iq = sigma * math.sqrt(2 * obter_modem(tipo).amostras_iq_por_simbolo / p.amostras_por_bit)
+    ruido = rng.normal(0.0, sigma_iq, (2,) + np.shape(sinal_iq))
+    return (sinal_iq + ruido[0] + 1j * ruido[1]).astype(p.dtype_complexo)
+
+# recebe as amostras complexas e o tipo de modulação, retorna os bits decididos
+def demodular_iq(sinal_iq: np.ndarray, tipo: str, parametros: ParametrosFisicos = None) -> np.ndarray:
+    p = _parametros(parametros)
+    return obter_modem(tipo).demodular_iq(np.asarray(sinal_iq, dtype=p.dtype_complexo), p)
+
+################################################### Lotes de Quadros ################################################
+
+# As funções *_vetorial, modular_iq, adicionar_ruido_iq e demodular_iq também aceitam um lote quadros x bits
+# (ou quadros x amostras) e processam cada linha como um quadro independente: a polaridade do Bipolar, a fase
+# da portadora e a janela dos filtros recomeçam em cada quadro, como em chamadas separadas. As funções abaixo
+# juntam as etapas de transmissão e de recepção para simulações de Monte Carlo com milhares de quadros curtos.
+
+# Converte o lote para uma matriz quadros x colunas, recusando vetores soltos
+def _matriz_do_lote(lote, dtype) -> np.ndarray:
+    matriz = np.asarray(lote, dtype=dtype)
+    if matriz.ndim != 2:
+        raise ValueError(f"O lote deve ser uma matriz quadros x amostras (recebido com {matriz.ndim} dimensões)")
+    return matriz
+
+# recebe um lote quadros x bits, retorna o lote quadros x amostras transmitido (sem portadora: só a banda base)
+def modular_lote(bits_lote, tipo_modulacao_bb: str, tipo_portadora: str = None,
+                 parametros: ParametrosFisicos = None) -> np.ndarray:
+    p = _parametros(parametros)
+    sinal_bb = codificar_banda_base_vetorial(_matriz_do_lote(bits_lote, np.int8), tipo_modulacao_bb, p)
+    if tipo_portadora is None:
+        return sinal_bb
+    return modular_sinal_analogico_vetorial(sinal_bb, tipo_modulacao_bb, tipo_portadora, p)
+
+# Soma ruído gaussiano de desvio sigma a todas as amostras do lote, no tipo das amostras
+def adicionar_ruido_lote(sinal_lote: np.ndarray, sigma: float, rng: np.random.Generator = None,
+                         parametros: ParametrosFisicos = None) -> np.ndarray:
+    if sigma <= 0: return sinal_lote
+    if rng is None: rng = np.random.default_rng()
+    p = _parametros(parametros)
+    return sinal_lote + sigma * rng.standard_normal(np.shape(sinal_lote), dtype=p.dtype)
+
+# recebe um lote quadros x amostras, retorna o lote quadros x bits recuperados
+def demodular_lote(sinal_lote, tipo_modulacao_bb: str, tipo_portadora: str = None, filtro: str = 'MEDIA-MOVEL',
+                   parametros: ParametrosFisicos = None) -> np.ndarray:
+    p = _parametros(parametros)
+    sinal = _matriz_do_lote(sinal_lote, p.dtype)
+    if tipo_portadora is not None:
+        sinal = demodular_sinal_analogico_vetorial(sinal, tipo_modulacao_bb, tipo_portadora, filtro, p)
+    return decodificar_banda_base_vetorial(sinal, tipo_modulacao_bb, p)
+
+# Quadros de tamanhos diferentes: são agrupados por tamanho e cada grupo vira um lote retangular, então nenhuma
+# amostra de preenchimento passa pelos filtros e o resultado é o mesmo de processar quadro a quadro.
+
+# Gera (posições, lote) para cada tamanho presente na lista de vetores
+def _agrupar_por_tamanho(linhas: list):
+    grupos = {}
+    for i, linha in enumerate(linhas):
+        grupos.setdefault(len(linha), []).append(i)
+    for indices in grupos.values():
+        yield indices, np.stack([linhas[i] for i in indices])
+
+# Empilha vetores de tamanhos diferentes numa matriz preenchida com zeros, junto com o tamanho de cada um
+def _empilhar_preenchido(linhas: list, dtype) -> tuple[np.ndarray, np.ndarray]:
+    comprimentos = np.array([len(linha) for linha in linhas], dtype=np.int64)
+    matriz = np.zeros((len(linhas), comprimentos.max(initial=0)), dtype=dtype)
+    for i, linha in enumerate(linhas):
+        matriz[i, :len(linha)] = linha
+    return matriz, comprimentos
+
+# recebe uma lista de quadros (bits) de tamanhos quaisquer, retorna (lote preenchido com zeros, amostras de cada quadro)
+def modular_lote_irregular(quadros: list, tipo_modulacao_bb: str, tipo_portadora: str = None,
+                           parametros: ParametrosFisicos = None) -> tuple[np.ndarray, np.ndarray]:
+    p = _parametros(parametros)
+    quadros = [np.asarray(quadro, dtype=np.int8) for quadro in quadros]
+    sinais = [None] * len(quadros)
+    for indices, lote in _agrupar_por_tamanho(quadros):
+        for i, sinal in zip(indices, modular_lote(lote, tipo_modulacao_bb, tipo_portadora, p)):
+            sinais[i] = sinal
+    return _empilhar_preenchido(sinais, p.dtype)
+
+# recebe o lote preenchido e as amostras válidas de cada quadro, retorna a lista de bits de cada quadro
+def demodular_lote_irregular(sinal_lote, comprimentos, tipo_modulacao_bb: str, tipo_portadora: str = None,
+                             filtro: str = 'MEDIA-MOVEL', parametros: ParametrosFisicos = None) -> list[np.ndarray]:
+    p = _parametros(parametros)
+    sinal = _matriz_do_lote(sinal_lote, p.dtype)
+    linhas = [sinal[i, :comprimento] for i, comprimento in enumerate(comprimentos)]
+    bits = [None] * len(linhas)
+    for indices, lote in _agrupar_por_tamanho(linhas):
+        for i, bits_quadro in zip(indices, demodular_lote(lote, tipo_modulacao_bb, tipo_portadora, filtro, p)):
+            bits[i] = bits_quadro
+    return bits
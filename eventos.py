@@ -0,0 +1,86 @@
+# imports necessários
+import heapq
+import itertools
+
+# Núcleo de simulação por eventos discretos: uma fila de prioridade (heap) de eventos ordenada pelo instante
+# simulado e um relógio virtual que salta direto para o próximo evento. O tempo simulado não depende do tempo
+# real: um atraso de 0.5 s é só um evento 0.5 s à frente, executado assim que os anteriores terminam.
+
+class Evento:
+    """Uma ação agendada para um instante do relógio virtual (pode ser cancelada antes de executar)."""
+    __slots__ = ('tempo', 'acao', 'args', 'cancelado')
+
+    def __init__(self, tempo: float, acao, args: tuple):
+        self.tempo = tempo
+        self.acao = acao
+        self.args = args
+        self.cancelado = False
+
+    def cancelar(self):
+        self.cancelado = True
+
+    def __repr__(self):
+        nome = getattr(self.acao, '__name__', repr(self.acao))
+        return f"Evento(tempo={self.tempo}, acao={nome}{', cancelado' if self.cancelado else ''})"
+
+class Escalonador:
+    """
+    Relógio virtual (agora, em segundos simulados) e fila de eventos. Eventos no mesmo instante executam na
+    ordem em que foram agendados; uma ação pode agendar novos eventos.
+    """
+
+    def __init__(self, inicio: float = 0.0):
+        self.agora = inicio
+        self.eventos_executados = 0
+        self._fila = []
+        self._sequencia = itertools.count()  # desempate entre eventos no mesmo instante
+
+    # agenda acao(*args) para daqui a atraso segundos simulados
+    def agendar(self, atraso: float, acao, *args) -> Evento:
+        if atraso < 0:
+            raise ValueError(f"O atraso não pode ser negativo (recebido: {atraso})")
+        return self.agendar_em(self.agora + atraso, acao, *args)
+
+    # agenda acao(*args) para um instante absoluto (não anterior ao atual)
+    def agendar_em(self, instante: float, acao, *args) -> Evento:
+        if instante < self.agora:
+            raise ValueError(f"O instante {instante} já passou (agora: {self.agora})")
+        evento = Evento(instante, acao, args)
+        heapq.heappush(self._fila, (instante, next(self._sequencia), evento))
+        return evento
+
+    # quantos eventos ainda não executados (contando os cancelados que ainda estão na fila)
+    @property
+    def pendentes(self) -> int:
+        return len(self._fila)
+
+    # instante do próximo evento não cancelado (None se não houver)
+    def proximo(self) -> float | None:
+        while self._fila and self._fila[0][2].cancelado:
+            heapq.heappop(self._fila)
+        return self._fila[0][0] if self._fila else None
+
+    # avança o relógio até o próximo evento e o executa; retorna False se não havia evento
+    def passo(self) -> bool:
+        if self.proximo() is None:
+            return False
+        instante, _, evento = heapq.heappop(self._fila)
+        self.agora = instante
+        self.eventos_executados += 1
+        evento.acao(*evento.args)
+        return True
+
+    def executar(self, ate: float = None) -> int:
+        """
+        Executa os eventos em ordem até a fila esvaziar ou, com ate, até o instante ate (o relógio termina
+        em ate). Retorna quantos eventos foram executados.
+        """
+        executados = self.eventos_executados
+        while (proximo := self.proximo()) is not None and (ate is None or proximo <= ate):
+            self.passo()
+        if ate is not None and ate > self.agora:
+            self.agora = ate
+        return self.eventos_executados - executados
+
+    def __repr__(self):
+        return f"Escalonador(agora={self.agora}, pendentes={self.pendentes})"
@@ -1,4 +1,5 @@
 import gi
+import queue
 import threading
 import simulador
 
@@ -39,10 +40,11 @@ class JanelaPrincipal(Gtk.Window):
 
         # Drops de Seleção
         self.combo_mod_bb = self.criar_combo(["NRZ-POLAR", "MANCHESTER", "BIPOLAR"])
-        self.combo_mod_port = self.criar_combo(["ASK", "FSK", "BPSK", "QPSK", "8PSK", "16-QAM", "Nenhuma"])
+        self.combo_mod_port = self.criar_combo(["ASK", "FSK", "4FSK", "BPSK", "QPSK", "8PSK", "16PSK", "32PSK", "16-QAM", "64-QAM", "256-QAM", "Nenhuma"])
         
         self.combo_enquadramento = self.criar_combo(["Contagem de Caracteres", "Inserção de Bytes", "Inserção de Bits"])
-        self.combo_erro = self.criar_combo(["Nenhum", "Paridade Par", "Checksum", "CRC", "Hamming"])
+        self.combo_erro = self.criar_combo(["Nenhum", "Paridade Par", "Checksum", "CRC", "CRC-32 IEEE", "Hamming",
+                                            "Hamming (7,4)", "Hamming (15,11)", "Hamming (72,64) SECDED"])
         
         # Slider de Ruído (CORREÇÃO: Usando Gtk.Scale moderno em vez de HScale)
         self.scale_ruido = Gtk.Scale.new_with_range(Gtk.Orientation.HORIZONTAL, 0, 5, 0.1)
@@ -134,9 +136,13 @@ class JanelaPrincipal(Gtk.Window):
         # 2. Configura Simulador
         self.sim.configurar(mod_bb, mod_port, usa_port, enquad, erro, ruido)
         
-        # 3. Transmite
+        # 3. Transmite (sem bloquear: esta é a thread da interface)
+        try:
+            self.sim.transmitir(texto, bloquear=False)
+        except queue.Full:
+            self.lbl_status.set_text("Fila de transmissão cheia, aguarde as mensagens anteriores")
+            return
         self.lbl_status.set_text("Transmitindo...")
-        self.sim.transmitir(texto)
 
     def atualizar_interface_rx(self, mensagem_rx, status):
         GLib.idle_add(self._atualizar_gui_safe, mensagem_rx, status)
@@ -153,7 +159,7 @@ class JanelaPrincipal(Gtk.Window):
         sinal_tx = self.sim.sinal_transmitido
         sinal_rx = self.sim.sinal_recebido
 
-        if sinal_tx:
+        if len(sinal_tx):
             self.ax1.plot(sinal_tx, color='blue')
             if self.combo_mod_port.get_active_text() == "Nenhuma":
                 self.ax1.set_title(f"Sinal Transmitido (Banda Base: {self.combo_mod_bb.get_active_text()})")
@@ -161,7 +167,7 @@ class JanelaPrincipal(Gtk.Window):
                 self.ax1.set_title("Sinal Transmitido (Modulado)")
             self.ax1.grid(True, alpha=0.3)
 
-        if sinal_rx:
+        if len(sinal_rx):
             self.ax2.plot(sinal_rx, color='red', alpha=0.7)
             self.ax2.set_title("Sinal Recebido (RX - Com Ruído)")
             self.ax2.grid(True, alpha=0.3)
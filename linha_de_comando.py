@@ -0,0 +1,162 @@
+# imports necessários
+import argparse
+import csv
+import json
+import sys
+import time
+import numpy as np
+import camada_enlace
+import camada_fisica
+from buffer_bits import BitBuffer
+from simulador import Simulador
+import varredura
+
+# Execução sem interface gráfica (não importa GTK nem matplotlib). Exemplos:
+#   python linha_de_comando.py transmitir --texto "Olá" --portadora BPSK --erro CRC --ruido 0.5 --repeticoes 10
+#   python linha_de_comando.py transmitir --arquivo dados.bin --iq --portadora 16-QAM --formato csv
+#   python linha_de_comando.py varredura --portadora BPSK QPSK --erro CRC "Hamming (7,4)" --ruidos 0 1 2 3
+# Cada execução (ou ponto da varredura) vira um registro em JSON (um objeto por linha) ou CSV.
+
+MODULACOES_BB = ["NRZ-POLAR", "MANCHESTER", "BIPOLAR"]
+ENQUADRAMENTOS = ["Contagem de Caracteres", "Inserção de Bytes", "Inserção de Bits"]
+CONTROLES_DE_ERRO = ["Nenhum", "Paridade Par", "Checksum", "CRC", "CRC-32 IEEE", "Hamming"] + camada_enlace.codigos_hamming()
+
+# "Nenhuma" desliga a portadora (banda base pura), como na interface
+def _portadoras() -> list[str]:
+    return camada_fisica.modems_registrados() + ["Nenhuma"]
+
+# argumentos da camada física comuns aos dois comandos
+def _adicionar_parametros_fisicos(parser: argparse.ArgumentParser):
+    parser.add_argument("--iq", action="store_true", help="banda base complexa (um ponto por símbolo; não vale para ASK e BPSK)")
+    parser.add_argument("--amostras-por-bit", type=int, default=None)
+    parser.add_argument("--portadora-freq", type=float, default=None)
+    parser.add_argument("--float32", action="store_true", help="amostras em float32 em vez de float64")
+    parser.add_argument("--bytes-cabecalho", type=int, choices=[1, 2, 4], default=1)
+    parser.add_argument("--semente", type=int, default=None, help="semente do ruído (reprodutível)")
+    parser.add_argument("--formato", choices=["json", "csv"], default="json")
+    parser.add_argument("--saida", default="-", help="arquivo dos registros (padrão: saída padrão)")
+
+def _criar_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Simulador de camada física e enlace sem interface gráfica")
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    transmitir = comandos.add_parser("transmitir", help="passa um texto ou arquivo pela cadeia TX/RX")
+    origem = transmitir.add_mutually_exclusive_group(required=True)
+    origem.add_argument("--texto")
+    origem.add_argument("--arquivo", help="arquivo transmitido byte a byte ('-' para a entrada padrão)")
+    transmitir.add_argument("--mod-bb", type=str.upper, choices=MODULACOES_BB, default="NRZ-POLAR")
+    transmitir.add_argument("--portadora", choices=_portadoras(), default="ASK")
+    transmitir.add_argument("--enquadramento", choices=ENQUADRAMENTOS, default=ENQUADRAMENTOS[0])
+    transmitir.add_argument("--erro", choices=CONTROLES_DE_ERRO, default="Nenhum")
+    transmitir.add_argument("--ruido", type=float, default=0.0, help="desvio padrão do ruído")
+    transmitir.add_argument("--repeticoes", type=int, default=1)
+    transmitir.add_argument("--mtu", type=int, default=128, help="bytes de dados por quadro")
+    transmitir.add_argument("--incluir-texto", action="store_true", help="inclui o texto recebido nos registros")
+    _adicionar_parametros_fisicos(transmitir)
+
+    varrer = comandos.add_parser("varredura", help="BER/FER para todas as combinações em paralelo")
+    varrer.add_argument("--mod-bb", type=str.upper, nargs="+", choices=MODULACOES_BB, default=["NRZ-POLAR"])
+    varrer.add_argument("--portadora", nargs="+", choices=_portadoras(), default=["ASK"])
+    varrer.add_argument("--enquadramento", nargs="+", choices=ENQUADRAMENTOS, default=[ENQUADRAMENTOS[0]])
+    varrer.add_argument("--erro", nargs="+", choices=CONTROLES_DE_ERRO, default=["Nenhum"])
+    varrer.add_argument("--ruidos", type=float, nargs="+", default=[0.0])
+    varrer.add_argument("--quadros", type=int, default=1000, help="quadros por ponto")
+    # na varredura cada mensagem é um único quadro: o MTU é bytes_por_quadro
+    varrer.add_argument("--bytes-por-quadro", type=int, default=32)
+    varrer.add_argument("--processos", type=int, default=None, help="padrão: todos os núcleos")
+    _adicionar_parametros_fisicos(varrer)
+    return parser
+
+# argumentos de Simulador.configurar a partir da linha de comando (menos o ruído e o MTU)
+def _configuracao(mod_bb: str, portadora: str, enquadramento: str, erro: str, args) -> dict:
+    return {
+        "mod_bb": mod_bb,
+        "mod_portadora": "ASK" if portadora == "Nenhuma" else portadora,
+        "usa_portadora": portadora != "Nenhuma",
+        "enquadramento": enquadramento,
+        "erro": erro,
+        "modo_iq": args.iq,
+        "amostras_por_bit": args.amostras_por_bit,
+        "portadora_freq": args.portadora_freq,
+        "dtype": np.float32 if args.float32 else np.float64,
+        "bytes_cabecalho": args.bytes_cabecalho,
+    }
+
+# dtype não é serializável: nos registros vai o nome
+def _campos_da_configuracao(configuracao: dict) -> dict:
+    return {**configuracao, "dtype": np.dtype(configuracao["dtype"]).name}
+
+def _ler_dados(args) -> bytes:
+    if args.texto is not None:
+        return args.texto.encode("latin-1", errors="replace")
+    if args.arquivo == "-":
+        return sys.stdin.buffer.read()
+    with open(args.arquivo, "rb") as arquivo:
+        return arquivo.read()
+
+def _registros_transmitir(args):
+    configuracao = {**_configuracao(args.mod_bb, args.portadora, args.enquadramento, args.erro, args), "mtu": args.mtu}
+    sim = Simulador()
+    sim.configurar(ruido=args.ruido, **configuracao)
+    if args.semente is not None:
+        sim.rng = np.random.default_rng(args.semente)
+
+    # cada byte vira o caractere de mesmo código, então qualquer arquivo passa sem alteração
+    dados = _ler_dados(args)
+    texto = dados.decode("latin-1")
+    enviados = BitBuffer.de_bytes(dados)
+
+    for execucao in range(args.repeticoes):
+        inicio = time.perf_counter()
+        resultado = sim.simular(texto)
+        segundos = time.perf_counter() - inicio
+
+        registro = {"execucao": execucao, **_campos_da_configuracao(configuracao), "ruido": args.ruido,
+                    "bytes": len(dados), "quadros": len(resultado.quadros), "status": resultado.status,
+                    "ok": resultado.texto == texto, "erros_de_bit": varredura.contar_erros_de_bit(enviados, resultado.bits),
+                    "bits_corrigidos": resultado.bits_corrigidos, "segundos": segundos,
+                    "bytes_por_segundo": len(dados) / segundos if segundos else 0.0}
+        if args.incluir_texto:
+            registro["texto"] = resultado.texto
+        yield registro
+
+def _registros_varredura(args):
+    configuracoes = [_configuracao(mod_bb, portadora, enquadramento, erro, args)
+                     for mod_bb in args.mod_bb for portadora in args.portadora
+                     for enquadramento in args.enquadramento for erro in args.erro]
+    resultado = varredura.varrer(configuracoes, args.ruidos, quadros_por_ponto=args.quadros,
+                                 bytes_por_quadro=args.bytes_por_quadro, semente=args.semente,
+                                 processos=args.processos)
+    for ponto in resultado.como_dicionarios():
+        yield {**ponto, "dtype": np.dtype(ponto["dtype"]).name, "semente": resultado.semente}
+
+# escreve cada registro assim que ele fica pronto (JSON: um objeto por linha; CSV: cabeçalho do primeiro registro)
+def _escrever(registros, formato: str, saida):
+    escritor = None
+    for registro in registros:
+        if formato == "json":
+            saida.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        else:
+            if escritor is None:
+                escritor = csv.DictWriter(saida, fieldnames=list(registro))
+                escritor.writeheader()
+            escritor.writerow(registro)
+        saida.flush()
+
+def main(argv: list[str] = None) -> int:
+    args = _criar_parser().parse_args(argv)
+    registros = _registros_transmitir(args) if args.comando == "transmitir" else _registros_varredura(args)
+    try:
+        if args.saida == "-":
+            _escrever(registros, args.formato, sys.stdout)
+        else:
+            with open(args.saida, "w", newline="", encoding="utf-8") as saida:
+                _escrever(registros, args.formato, saida)
+    except ValueError as erro:
+        # configuração inválida (ex: quadro que não cabe no cabeçalho)
+        print(f"erro: {erro}", file=sys.stderr)
+        return 2
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -172,6 +172,210 @@ print(f"Dados Corrigidos: {dados_corrigidos}")
 
 print(f"Sucesso? {dados_hamming == dados_corrigidos}")
 
+import random
+from buffer_bits import BitBuffer
+
+# Compara as versões otimizadas da camada de enlace (tabelas, bytes, matrizes) com as implementações originais
+# em listas de bits, copiadas abaixo como referência, em entradas aleatórias e casos de borda.
+
+print("\n############## VERIFICAÇÃO: VERSÕES OTIMIZADAS x ORIGINAIS ##############")
+aleatorio = random.Random(1234)
+
+def bits_aleatorios(n: int, prob_um: float = 0.5) -> list[int]:
+    return [int(aleatorio.random() < prob_um) for _ in range(n)]
+
+# tamanhos desalinhados de byte e sequências longas de '1' (inserção de bits, FLAGs)
+casos = [[], [1], [0] * 7, [1] * 5, [1] * 6, [1] * 40, [0, 1, 1, 1, 1, 1, 1, 0] * 3]
+casos += [bits_aleatorios(n) for n in list(range(1, 70)) + [128, 257, 1000]]
+casos += [bits_aleatorios(n, 0.9) for n in (13, 64, 99, 500)]
+
+# --- Referências: implementações originais (listas de bits) ---
+
+def crc32_original(bits: list[int]) -> list[int]:
+    # divisão polinomial bit a bit com o polinômio de 32 termos do código original (grau 31)
+    poly = [1, 0, 0, 0, 0, 0, 1, 0, 0, 1, 1, 0, 0, 0, 0, 1,
+            0, 0, 0, 1, 1, 1, 0, 1, 1, 0, 1, 1, 0, 1, 1, 1]
+    resto = list(bits) + [0] * 32
+    for i in range(len(bits)):
+        if resto[i] == 1:
+            for j in range(len(poly)):
+                resto[i + j] ^= poly[j]
+    return resto[-32:]
+
+def checksum_original(bits: list[int]) -> list[int]:
+    dados = list(bits)
+    while len(dados) % 16 != 0:
+        dados.append(0)
+    soma = 0
+    for i in range(0, len(dados), 16):
+        soma += int("".join(str(b) for b in dados[i:i+16]), 2)
+        if soma > 0xFFFF:
+            soma = (soma & 0xFFFF) + 1
+    return [int(x) for x in format(~soma & 0xFFFF, '016b')]
+
+def insercao_de_bits_original(bits: list[int]) -> list[int]:
+    quadro, contador_uns = list(camada_enlace.FLAG_BIT), 0
+    for bit in bits:
+        quadro.append(bit)
+        if bit == 1:
+            contador_uns += 1
+            if contador_uns == 5:
+                quadro.append(0)
+                contador_uns = 0
+        else:
+            contador_uns = 0
+    return quadro + camada_enlace.FLAG_BIT
+
+def remocao_de_bits_original(bits: list[int]) -> list[int]:
+    if len(bits) < 16: return []
+    dados, contador_uns = [], 0
+    for bit in bits[8:-8]:
+        if bit == 1:
+            contador_uns += 1
+            dados.append(bit)
+        elif contador_uns == 5:
+            contador_uns = 0  # zero inserido pelo transmissor
+        else:
+            dados.append(bit)
+            contador_uns = 0
+    return dados
+
+def flags_original(bits: list[int]) -> list[int]:
+    return [i for i in range(len(bits) - 7) if bits[i:i+8] == camada_enlace.FLAG_BIT]
+
+def insercao_de_bytes_original(bits: list[int]) -> list[int]:
+    quadro = list(camada_enlace.FLAG_BYTE)
+    for byte in camada_enlace.dados_para_bytes(bits):
+        if byte == camada_enlace.FLAG_BYTE or byte == camada_enlace.ESC_BYTE:
+            quadro += camada_enlace.ESC_BYTE
+        quadro += byte
+    return quadro + camada_enlace.FLAG_BYTE
+
+# --- CRC-32 por tabelas (slice-by-8) ---
+
+# 'DIVISAO' reproduz o original, inclusive o polinômio de grau 31 e bytes incompletos; em pedaços (update) também
+ok_crc = all(camada_enlace._calcular_crc32(bits) == crc32_original(bits) for bits in casos)
+ok_crc_lista = all(camada_enlace.adicionar_crc(bits) == bits + crc32_original(bits) for bits in casos)
+ok_crc_fluxo = True
+for bits in casos:
+    corte = aleatorio.randint(0, len(bits))
+    crc = camada_enlace.CRC32(bits[:corte])
+    crc.update(BitBuffer(bits[corte:]))
+    ok_crc_fluxo &= crc.digest_bits() == crc32_original(bits)
+ok_crc_verifica = all(camada_enlace.verificar_crc(bits + crc32_original(bits)) for bits in casos)
+# 'IEEE' é o CRC-32 do Ethernet: valor de verificação conhecido de b"123456789"
+ok_crc_ieee = camada_enlace.CRC32(b"123456789", 'IEEE').valor() == 0xCBF43926
+print(f"CRC-32 'DIVISAO' == divisão original ({len(casos)} casos): {ok_crc and ok_crc_lista}")
+print(f"CRC-32 em pedaços (update) == divisão original: {ok_crc_fluxo}")
+print(f"verificar_crc aceita quadros do original: {ok_crc_verifica}")
+print(f"CRC-32 'IEEE' de '123456789' == 0xCBF43926: {ok_crc_ieee}")
+
+# --- Checksum em bloco e atualização incremental (RFC 1624) ---
+
+ok_checksum = all(camada_enlace._calcular_checksum_16b(bits) == checksum_original(bits) for bits in casos)
+ok_checksum_verifica = all(camada_enlace.verificar_checksum(bits + checksum_original(bits)) for bits in casos)
+print(f"Checksum em bloco == soma original ({len(casos)} casos): {ok_checksum and ok_checksum_verifica}")
+
+# trocar algumas palavras de 16 bits com atualizar_checksum dá o mesmo checksum de recalcular o quadro todo
+ok_rfc1624 = True
+for _ in range(200):
+    dados = bits_aleatorios(16 * aleatorio.randint(1, 20))
+    quadro = camada_enlace.adicionar_checksum(dados)
+    posicao = 16 * aleatorio.randint(0, len(dados) // 16 - 1)
+    novos = bits_aleatorios(16 * aleatorio.randint(1, (len(dados) - posicao) // 16))
+    novos_dados = dados[:posicao] + novos + dados[posicao + len(novos):]
+    ok_rfc1624 &= camada_enlace.substituir_bits_com_checksum(quadro, posicao, novos) == camada_enlace.adicionar_checksum(novos_dados)
+# dados que viram todos zero (inclusive troca vazia em dados já zerados): o checksum deve ser 0xFFFF, não 0x0000
+casos_zero = [([1] * 16, 0, [0] * 16), ([0] * 48, 16, []), ([0] * 48, 5, [0] * 7), ([1] * 32, 0, [0] * 32)]
+for dados, posicao, novos in casos_zero:
+    quadro = camada_enlace.adicionar_checksum(dados)
+    novos_dados = dados[:posicao] + novos + dados[posicao + len(novos):]
+    resultado = camada_enlace.substituir_bits_com_checksum(quadro, posicao, novos)
+    ok_rfc1624 &= camada_enlace.verificar_checksum(resultado) and resultado == camada_enlace.adicionar_checksum(novos_dados)
+print(f"Atualização incremental (RFC 1624) == checksum recalculado ({200 + len(casos_zero)} casos): {ok_rfc1624}")
+
+# --- Inserção de bits por tabelas (estado x byte) ---
+
+ok_insercao = all(camada_enlace.enquadrar_insercao_de_bits(bits) == insercao_de_bits_original(bits) for bits in casos)
+ok_remocao = all(camada_enlace.desenquadrar_insercao_de_bits(quadro) == remocao_de_bits_original(quadro)
+                 for quadro in [insercao_de_bits_original(bits) for bits in casos] + casos)
+ok_ida_e_volta = all(camada_enlace.desenquadrar_insercao_de_bits(camada_enlace.enquadrar_insercao_de_bits(BitBuffer(bits))) == bits
+                     for bits in casos)
+ok_flags = all(camada_enlace.encontrar_flags(bits) == flags_original(bits) for bits in casos)
+print(f"Inserção/remoção de bits por tabelas == original: {ok_insercao and ok_remocao}")
+print(f"Inserção de bits ida e volta (BitBuffer): {ok_ida_e_volta}")
+print(f"Busca de FLAGs por tabelas == busca bit a bit: {ok_flags}")
+
+# --- Inserção de bytes sobre bytes ---
+
+ok_bytes = all(camada_enlace.enquadrar_insercao_de_bytes(bits) == insercao_de_bytes_original(bits)
+               for bits in casos if len(bits) % 8 == 0)
+ok_bytes_volta = True
+for _ in range(200):
+    # muitos FLAG e ESC nos dados
+    dados = bytes(aleatorio.choice([0x7E, 0x1B, 0x00, 0xFF, aleatorio.randrange(256)]) for _ in range(aleatorio.randint(0, 40)))
+    ok_bytes_volta &= camada_enlace.remover_escape(camada_enlace.inserir_escape(dados)) == dados
+    bits = BitBuffer.de_bytes(dados)
+    ok_bytes_volta &= camada_enlace.desenquadrar_insercao_de_bytes(camada_enlace.enquadrar_insercao_de_bytes(bits)) == bits
+print(f"Inserção de bytes == original e ida e volta com FLAG/ESC nos dados: {ok_bytes and ok_bytes_volta}")
+
+# --- Hamming em blocos e SECDED ---
+
+ok_hamming = True
+for nome in camada_enlace.codigos_hamming():
+    codigo = camada_enlace.obter_codigo_hamming(nome)
+    for bits in casos:
+        codificado = codigo.codificar(bits)
+        ok_hamming &= len(codificado) == codigo.tamanho_codificado(len(bits))
+        ok_hamming &= codigo.decodificar(codificado) == (bits, 0, 0)
+        if not bits:
+            continue
+        # um erro em cada bloco (inclusive nas paridades e no bloco encurtado): todos corrigidos
+        com_erro = list(codificado)
+        n_blocos = -(-len(bits) // codigo.k)
+        for bloco in range(n_blocos):
+            inicio = bloco * codigo.n
+            com_erro[aleatorio.randrange(inicio, min(inicio + codigo.n, len(com_erro)))] ^= 1
+        ok_hamming &= codigo.decodificar(com_erro) == (bits, n_blocos, 0)
+        # dois erros no mesmo bloco: o SECDED detecta e não corrige
+        if codigo.estendido and len(codificado) >= 2:
+            com_erro = list(codificado)
+            for posicao in aleatorio.sample(range(min(codigo.n, len(codificado))), 2):
+                com_erro[posicao] ^= 1
+            _, corrigidos, incorrigiveis = codigo.decodificar(com_erro)
+            ok_hamming &= (corrigidos, incorrigiveis) == (0, 1)
+print(f"Hamming em blocos (7,4), (15,11), (72,64) SECDED: corrige 1 erro por bloco, SECDED detecta 2: {ok_hamming}")
+
+# Hamming genérico: cada erro de um bit é corrigido
+ok_generico = True
+for bits in casos[1:40]:
+    codificado = camada_enlace.adicionar_hamming(bits)
+    for posicao in range(len(codificado)):
+        com_erro = list(codificado)
+        com_erro[posicao] ^= 1
+        ok_generico &= camada_enlace.corrigir_hamming(com_erro) == (bits, 1)
+print(f"Hamming genérico corrige qualquer erro de um bit: {ok_generico}")
+
+# --- Camada física: lote e fluxo contínuo x quadro a quadro (inclusive quadro vazio) ---
+
+import numpy as np
+
+ok_lote = True
+quadros_fisica = [bits_aleatorios(n) for n in (0, 3, 8, 8, 0, 21)]
+for portadora in ('BPSK', 'FSK', 'QPSK'):
+    for filtro in ('MEDIA-MOVEL', 'FIR'):
+        lote, comprimentos = camada_fisica.modular_lote_irregular(quadros_fisica, 'MANCHESTER', portadora)
+        recebidos = camada_fisica.demodular_lote_irregular(lote, comprimentos, 'MANCHESTER', portadora, filtro)
+        for linha, comprimento, recebido in zip(lote, comprimentos, recebidos):
+            sinal = linha[:comprimento]
+            banda_base = camada_fisica.demodular_sinal_analogico_vetorial(sinal, 'MANCHESTER', portadora, filtro)
+            ok_lote &= np.array_equal(recebido, camada_fisica.decodificar_banda_base_vetorial(banda_base, 'MANCHESTER'))
+            fluxo = camada_fisica.DemoduladorAnalogico('MANCHESTER', portadora, filtro)
+            metade = len(sinal) // 2
+            em_fluxo = np.concatenate((fluxo.processar(sinal[:metade]), fluxo.processar(sinal[metade:]), fluxo.finalizar()))
+            ok_lote &= len(em_fluxo) == len(banda_base) and np.allclose(em_fluxo, banda_base, atol=1e-6)
+print(f"Camada física em lote e em fluxo == quadro a quadro (inclusive quadro vazio): {ok_lote}")
+
 import simulador
 import time
 
@@ -1,182 +1,602 @@
+import asyncio
+import collections
+import copy
+import queue
 import threading
 import time
-import random
+import traceback
+from concurrent.futures import Future
+import numpy as np
 import camada_fisica
 import camada_enlace
+from buffer_bits import BitBuffer, como_buffer
 import definicoes
 
+class ResultadoTransmissao:
+    """
+    Resultado de uma mensagem na recepção: os dados entregues e o status de cada quadro, quantos bits o
+    controle de erro corrigiu, e o texto e o status finais (os mesmos passados ao callback). Guarda também os
+    sinais do primeiro quadro (os dos gráficos), que pertencem só a esta mensagem.
+    """
+
+    def __init__(self, quadros: list[BitBuffer], status_quadros: list[str], bits_corrigidos: int, texto: str, status: str):
+        self.quadros = quadros
+        self.status_quadros = status_quadros
+        self.bits_corrigidos = bits_corrigidos
+        self.texto = texto
+        self.status = status
+        self.sinal_banda_base_tx = []
+        self.sinal_transmitido = []
+        self.sinal_recebido = []
+        self.sinal_demodulado = []
+        # instantes simulados de envio e de entrega (só no escalonador de eventos, EnlaceSimulado)
+        self.enviado_em = None
+        self.entregue_em = None
+
+    # segundos simulados entre o envio e a entrega (None fora do escalonador de eventos)
+    @property
+    def latencia(self) -> float | None:
+        if self.enviado_em is None or self.entregue_em is None:
+            return None
+        return self.entregue_em - self.enviado_em
+
+    # dados de todos os quadros, na ordem
+    @property
+    def bits(self) -> BitBuffer:
+        bits = BitBuffer()
+        for quadro in self.quadros:
+            bits += quadro
+        return bits
+
+    def __repr__(self):
+        return f"ResultadoTransmissao({self.texto!r}, {self.status!r}, quadros={len(self.quadros)})"
+
+class _Mensagem:
+    """
+    Uma mensagem em andamento entre as threads de TX e RX: o texto, uma cópia do simulador com a configuração do
+    momento do envio (onde ficam os sinais desta mensagem), o Future entregue a quem transmitiu e o que o RX já
+    recebeu.
+    """
+
+    def __init__(self, texto: str, configuracao: 'Simulador'):
+        self.texto = texto
+        self.configuracao = configuracao
+        self.futuro = Future()
+        self.quadros = []
+        self.status_quadros = []
+        self.bits_corrigidos = 0
+        self.erro = None
+        self.enviado_em = None       # usados só pelo EnlaceSimulado
+        self.evento_timeout = None
+        self.sinais = None           # gerador dos quadros ainda não transmitidos
+
+# sinais dos gráficos (primeiro quadro) de um simulador ou resultado para outro
+def _copiar_sinais(origem, destino):
+    destino.sinal_banda_base_tx = origem.sinal_banda_base_tx
+    destino.sinal_transmitido = origem.sinal_transmitido
+    destino.sinal_recebido = origem.sinal_recebido
+    destino.sinal_demodulado = origem.sinal_demodulado
+
 class Simulador:
     def __init__(self):
         # Configurações Padrão
         self.tipo_modulacao_bb = "NRZ-POLAR"
         self.tipo_modulacao_portadora = "ASK"
+        self.modem = camada_fisica.obter_modem(self.tipo_modulacao_portadora)
         self.usa_portadora = True
         
         self.tipo_enquadramento = "Contagem de Caracteres"
         self.tipo_erro = "Nenhum" 
         self.snr_ruido = 0.0 
+        self.modo_iq = False  # banda base complexa: um ponto complexo por símbolo em vez da portadora amostrada
+        self.parametros = camada_fisica.PARAMETROS_PADRAO  # amostras por bit, portadora e tipo das amostras
+        self.mtu = 128             # bytes de dados por quadro
+        self.bytes_cabecalho = 1   # tamanho do cabeçalho da contagem de caracteres
+        self.atraso_propagacao = 0.5  # segundos entre a saída do TX e a chegada ao RX
+        self.taxa_bits = 1000.0       # bits por segundo no meio (tempo de transmissão no EnlaceSimulado)
         
-        # Armazenamento para Gráficos
+        # Armazenamento para Gráficos (sinais da última mensagem entregue)
         self.sinal_banda_base_tx = [] 
         self.sinal_transmitido = []   
         self.sinal_recebido = []      
         self.sinal_demodulado = []    
         
+        # Gerador de números aleatórios do ruído
+        self.rng = np.random.default_rng()
+        
         self.callback_rx = None
+        
+        # Threads de TX e RX (criadas no primeiro transmitir) ligadas por filas limitadas: o TX prepara o
+        # quadro k+1 enquanto o RX decodifica o quadro k, e um produtor mais rápido espera quando a fila enche
+        self.tamanho_fila = 16   # mensagens esperando o TX e quadros esperando o RX
+        self._fila_tx = None
+        self._fila_rx = None
+        self._threads = []
+        self._trava = threading.Lock()
 
-    def configurar(self, mod_bb, mod_portadora, usa_portadora, enquadramento, erro, ruido):
+    def configurar(self, mod_bb, mod_portadora, usa_portadora, enquadramento, erro, ruido, modo_iq=False,
+                   amostras_por_bit=None, portadora_freq=None, dtype=np.float64, mtu=128, bytes_cabecalho=1):
+        # o modem é procurado uma única vez aqui, não a cada transmissão
+        modem = camada_fisica.obter_modem(mod_portadora)
+        # o modo IQ só reproduz a cadeia de portadora amostrada nos modems por correlação (ver camada_fisica)
+        if modo_iq and usa_portadora and modem.nome in camada_fisica.MODULACOES_LINEARES:
+            raise ValueError(f"O modo IQ não reproduz a cadeia de portadora do {modem.nome} "
+                             f"(mixer, filtro e codificação de linha); use a portadora amostrada")
         self.tipo_modulacao_bb = mod_bb
         self.tipo_modulacao_portadora = mod_portadora
+        self.modem = modem
         self.usa_portadora = usa_portadora
         self.tipo_enquadramento = enquadramento
         self.tipo_erro = erro
         self.snr_ruido = ruido
+        self.modo_iq = modo_iq
+        # parâmetros próprios desta simulação (os omitidos vêm de definicoes.py)
+        self.parametros = camada_fisica.ParametrosFisicos(amostras_por_bit, portadora_freq, dtype=dtype)
+        # bytes de dados por quadro (mensagens maiores são segmentadas) e tamanho do cabeçalho da contagem
+        if mtu < 1:
+            raise ValueError(f"O MTU deve ser de pelo menos 1 byte (recebido: {mtu})")
+        self.mtu = mtu
+        self.bytes_cabecalho = bytes_cabecalho
 
     def registrar_callback(self, funcao):
         self.callback_rx = funcao
 
-    def transmitir(self, mensagem_texto: str):
-        # Limpa buffers antigos
-        self.sinal_transmitido = []
-        self.sinal_recebido = []
+    def transmitir(self, mensagem_texto: str, bloquear: bool = True) -> Future:
+        """
+        Coloca a mensagem na fila do TX e retorna logo um Future com o ResultadoTransmissao (o callback também é
+        chamado). A mensagem usa a configuração do momento do envio: um configurar() depois não a altera.
+        Se já houver tamanho_fila mensagens esperando o TX, espera uma vaga ou, com bloquear=False, levanta
+        queue.Full (para quem não pode parar, como a thread da interface gráfica).
+        """
+        self._iniciar_threads()
+        mensagem = _Mensagem(mensagem_texto, copy.copy(self))
+        self._fila_tx.put(mensagem, block=bloquear)
+        return mensagem.futuro
+
+    def encerrar(self):
+        # termina as threads de TX e RX depois das mensagens já enviadas
+        with self._trava:
+            if not self._threads:
+                return
+            self._fila_tx.put(None)
+            for thread in self._threads:
+                thread.join()
+            self._threads = []
+
+    def _iniciar_threads(self):
+        with self._trava:
+            if self._threads:
+                return
+            self._fila_tx = queue.Queue(self.tamanho_fila)
+            self._fila_rx = queue.Queue(self.tamanho_fila)
+            # daemon: não impedem o programa de terminar
+            self._threads = [threading.Thread(target=self._thread_tx, name="Simulador TX", daemon=True),
+                             threading.Thread(target=self._thread_rx, name="Simulador RX", daemon=True)]
+            for thread in self._threads:
+                thread.start()
+
+    def simular(self, mensagem_texto: str) -> ResultadoTransmissao:
+        """
+        Transmite e recebe a mensagem na própria thread, sem atraso de propagação, prints ou callback
+        (para simulações em lote, como a varredura de BER em varredura.py).
+        """
+        resultado = self._receber_mensagem(self._sinais_da_mensagem(mensagem_texto))
+        _copiar_sinais(self, resultado)
+        return resultado
+
+    async def transmitir_assincrono(self, mensagem_texto: str, executor=None) -> ResultadoTransmissao:
+        """
+        Versão asyncio: resultado = await sim.transmitir_assincrono(texto). TX e RX (numpy) rodam no executor
+        (None: o padrão do loop, de threads) e a propagação é um asyncio.sleep, então milhares de enlaces
+        simulados podem estar em andamento num único loop. Como simular, não faz prints nem chama o callback;
+        a configuração é a do momento da chamada.
+        """
+        config = copy.copy(self)
+        loop = asyncio.get_running_loop()
+        sinais = await loop.run_in_executor(executor, lambda: list(config._sinais_da_mensagem(mensagem_texto)))
         
-        # Inicia Thread
-        thread_tx = threading.Thread(target=self._fluxo_tx, args=(mensagem_texto,))
-        thread_tx.start()
+        await asyncio.sleep(config.atraso_propagacao) # Simula propagação
+        
+        resultado = await loop.run_in_executor(executor, config._receber_mensagem, sinais)
+        _copiar_sinais(config, resultado)
+        return resultado
 
     #########################################################################
     # FLUXO DE TRANSMISSÃO (TX)
     #########################################################################
-    def _fluxo_tx(self, texto: str):
-        print(f"\n[Simulador] TX Iniciado: '{texto}'")
-        
-        # 1. Aplicação: Texto -> Bits
-        bits_dados = self._texto_para_bits(texto)
-        
+    def _thread_tx(self):
+        # uma mensagem por vez, na ordem de chegada; cada quadro vai para a fila do RX assim que fica pronto
+        while (mensagem := self._fila_tx.get()) is not None:
+            # uma mensagem cujo Future foi cancelado antes de começar não é transmitida
+            if not mensagem.futuro.set_running_or_notify_cancel():
+                continue
+            config = mensagem.configuracao
+            print(f"\n[Simulador] TX Iniciado: '{mensagem.texto}'")
+            try:
+                # a chegada ao RX é o instante de saída mais o atraso de propagação; o TX segue para o próximo
+                # quadro sem esperar
+                for sinal in config._sinais_da_mensagem(mensagem.texto):
+                    self._fila_rx.put((mensagem, sinal, time.monotonic() + config.atraso_propagacao))
+            except Exception as erro:
+                mensagem.erro = erro
+            # fim da mensagem, que chega junto com o último quadro
+            self._fila_rx.put((mensagem, None, time.monotonic() + config.atraso_propagacao))
+        self._fila_rx.put(None)
+
+    def _sinais_da_mensagem(self, texto: str):
+        # 1. Aplicação: Texto -> Bits, em segmentos de até MTU bytes; 2. a 5. um quadro de cada vez, à medida
+        # que são pedidos (os gráficos mostram o primeiro)
+        segmentos = self._segmentar(self._texto_para_bits(texto))
+        for indice, segmento in enumerate(segmentos):
+            yield self._transmitir_quadro(segmento, registrar=(indice == 0))
+
+    def _tempo_de_transmissao(self, sinal: np.ndarray) -> float:
+        # segundos que o quadro ocupa o meio: símbolos (amostras / amostras por símbolo) x bits por símbolo / taxa
+        if self.usa_portadora and self.modo_iq:
+            simbolos = len(sinal) / self.modem.amostras_iq_por_simbolo
+        else:
+            simbolos = len(sinal) / self.parametros.amostras_por_bit
+        bits_por_simbolo = self.modem.bits_por_simbolo if self.usa_portadora else 1
+        return simbolos * bits_por_simbolo / self.taxa_bits
+
+    def _transmitir_quadro(self, bits_dados: BitBuffer, registrar: bool = False) -> np.ndarray:
         # 2. Enlace: Controle de Erro + Enquadramento
         bits_ctrl = self._aplicar_controle_erro_tx(bits_dados)
         bits_quadro = self._aplicar_enquadramento_tx(bits_ctrl)
         
         # 3. Física: Codificação Banda Base (Bits -> Tensão)
-        sinal_bb = camada_fisica.codificar_banda_base(bits_quadro, self.tipo_modulacao_bb)
-        self.sinal_banda_base_tx = sinal_bb 
+        # No modo IQ os bits vão direto para os símbolos complexos, sem gerar a banda base amostrada
+        if self.usa_portadora and self.modo_iq:
+            sinal_bb = np.empty(0, dtype=self.parametros.dtype)
+        else:
+            sinal_bb = camada_fisica.codificar_banda_base_vetorial(bits_quadro, self.tipo_modulacao_bb, self.parametros)
         
         # 4. Física: Modulação Analógica (Tensão -> Portadora)
-        if self.usa_portadora:
+        if self.usa_portadora and self.modo_iq:
+            sinal_final = camada_fisica.modular_iq(bits_quadro, self.modem, self.parametros)
+        elif self.usa_portadora:
             # AGORA CHAMAMOS A CAMADA FÍSICA DIRETAMENTE
-            sinal_final = camada_fisica.modular_sinal_analogico(sinal_bb, self.tipo_modulacao_bb, self.tipo_modulacao_portadora)
+            sinal_final = camada_fisica.modular_sinal_analogico_vetorial(sinal_bb, self.tipo_modulacao_bb, self.modem,
+                                                                           parametros=self.parametros)
         else:
             sinal_final = sinal_bb
-
-        self.sinal_transmitido = sinal_final
         
-        # 5. Meio de Comunicação (Ruído + Delay)
+        # 5. Meio de Comunicação (Ruído)
         sinal_ruidoso = self._aplicar_ruido(sinal_final)
-        self.sinal_recebido = sinal_ruidoso
-        
-        time.sleep(0.5) # Simula propagação
         
-        # Passa para o RX
-        self._fluxo_rx(sinal_ruidoso)
+        if registrar:
+            self.sinal_banda_base_tx = sinal_bb 
+            self.sinal_transmitido = sinal_final
+            self.sinal_recebido = sinal_ruidoso
+        return sinal_ruidoso
 
     #########################################################################
     # FLUXO DE RECEPÇÃO (RX)
     #########################################################################
-    def _fluxo_rx(self, sinal_recebido: list[float]):
-        print("[Simulador] RX Iniciado...")
+    def _thread_rx(self):
+        # Simula propagação: cada quadro é decodificado assim que sai da fila (o sinal não fica esperando) e a
+        # mensagem é entregue no instante de chegada do seu último quadro. No "meio" ficam só esses instantes,
+        # não os sinais, então qualquer número de quadros pode estar a caminho ao mesmo tempo; na memória há no
+        # máximo tamanho_fila sinais (a fila) e os bits já recebidos
+        a_entregar = collections.deque()  # (chegada do último quadro, mensagem), na ordem de envio
+        encerrar = False
+        while a_entregar or not encerrar:
+            if a_entregar and (encerrar or a_entregar[0][0] <= time.monotonic()):
+                chegada, mensagem = a_entregar.popleft()
+                espera = chegada - time.monotonic()
+                if espera > 0:
+                    time.sleep(espera)
+                self._entregar(mensagem)
+                continue
+            try:
+                item = self._fila_rx.get(timeout=max(0.0, a_entregar[0][0] - time.monotonic()) if a_entregar else None)
+            except queue.Empty:
+                continue
+            if item is None:
+                encerrar = True
+                continue
+            mensagem, sinal, chegada = item
+            if sinal is None:  # fim da mensagem
+                a_entregar.append((chegada, mensagem))
+            elif mensagem.erro is None:
+                self._receber_quadro_da_mensagem(mensagem, sinal)
+
+    def _receber_quadro_da_mensagem(self, mensagem: '_Mensagem', sinal: np.ndarray):
+        if not mensagem.quadros:
+            print("[Simulador] RX Iniciado...")
+        try:
+            bits, status, corrigidos = mensagem.configuracao._receber_quadro(sinal, registrar=not mensagem.quadros)
+        except Exception as erro:
+            mensagem.erro = erro
+            return
+        mensagem.quadros.append(bits)
+        mensagem.status_quadros.append(status)
+        mensagem.bits_corrigidos += corrigidos
+
+    def _entregar(self, mensagem: '_Mensagem'):
+        if mensagem.erro is not None:
+            print(f"[RX] Falha na simulação: {mensagem.erro!r}")
+            mensagem.futuro.set_exception(mensagem.erro)
+            self._chamar_callback("", f"Erro na simulação: {mensagem.erro}")
+            return
         
-        # 1. Física: Demodulação Analógica (Portadora -> Tensão)
-        if self.usa_portadora:
-            # AGORA CHAMAMOS A CAMADA FÍSICA DIRETAMENTE
-            sinal_recuperado_bb = camada_fisica.demodular_sinal_analogico(sinal_recebido, self.tipo_modulacao_bb, self.tipo_modulacao_portadora)
-        else:
+        # 5. Aplicação: Bits -> Texto (remontado na ordem dos quadros)
+        resultado = self._montar_resultado(mensagem.quadros, mensagem.status_quadros, mensagem.bits_corrigidos)
+        _copiar_sinais(mensagem.configuracao, resultado)
+        print(f"[RX] Texto Final: {resultado.texto} ({resultado.status})")
+        
+        # sinais da última mensagem entregue, para quem ainda lê os atributos do simulador
+        _copiar_sinais(resultado, self)
+        mensagem.futuro.set_result(resultado)
+        self._chamar_callback(resultado.texto, resultado.status)
+
+    def _chamar_callback(self, texto: str, status: str):
+        # um erro no callback não pode derrubar a thread de RX (as mensagens seguintes ficariam sem resposta)
+        if not self.callback_rx:
+            return
+        try:
+            self.callback_rx(texto, status)
+        except Exception:
+            print("[RX] Erro no callback:")
+            traceback.print_exc()
+
+    def _receber_mensagem(self, sinais_recebidos) -> ResultadoTransmissao:
+        # um sinal (um quadro) ou uma sequência de sinais, um por quadro
+        if isinstance(sinais_recebidos, np.ndarray):
+            sinais_recebidos = [sinais_recebidos]
+        
+        # 1. a 4. para cada quadro, na ordem em que chegam
+        quadros, status_quadros, bits_corrigidos = [], [], 0
+        for indice, sinal in enumerate(sinais_recebidos):
+            bits_finais, status, corrigidos = self._receber_quadro(sinal, registrar=(indice == 0))
+            quadros.append(bits_finais)
+            status_quadros.append(status)
+            bits_corrigidos += corrigidos
+        return self._montar_resultado(quadros, status_quadros, bits_corrigidos)
+
+    def _montar_resultado(self, quadros: list[BitBuffer], status_quadros: list[str], bits_corrigidos: int) -> ResultadoTransmissao:
+        # 5. Aplicação: Bits -> Texto (remontado na ordem dos quadros)
+        texto = "".join(self._bits_para_texto(bits) for bits in quadros)
+        return ResultadoTransmissao(quadros, status_quadros, bits_corrigidos, texto, self._resumir_status(status_quadros))
+
+    def _receber_quadro(self, sinal_recebido: np.ndarray, registrar: bool = False) -> tuple[BitBuffer, str, int]:
+        # 1. e 2. no modo IQ: decisão direta dos símbolos complexos (Símbolos -> Bits)
+        if self.usa_portadora and self.modo_iq:
             sinal_recuperado_bb = sinal_recebido
+            bits_brutos = BitBuffer(camada_fisica.demodular_iq(sinal_recebido, self.modem, self.parametros))
+        else:
+            # 1. Física: Demodulação Analógica (Portadora -> Tensão)
+            if self.usa_portadora:
+                # AGORA CHAMAMOS A CAMADA FÍSICA DIRETAMENTE
+                sinal_recuperado_bb = camada_fisica.demodular_sinal_analogico_vetorial(sinal_recebido, self.tipo_modulacao_bb, self.modem,
+                                                                                         parametros=self.parametros)
+            else:
+                sinal_recuperado_bb = sinal_recebido
             
-        self.sinal_demodulado = sinal_recuperado_bb
+            # 2. Física: Decodificação Banda Base (Tensão -> Bits)
+            bits_brutos = BitBuffer(camada_fisica.decodificar_banda_base_vetorial(sinal_recuperado_bb, self.tipo_modulacao_bb, self.parametros))
         
-        # 2. Física: Decodificação Banda Base (Tensão -> Bits)
-        bits_brutos = camada_fisica.decodificar_banda_base(sinal_recuperado_bb, self.tipo_modulacao_bb)
+        if registrar:
+            self.sinal_demodulado = sinal_recuperado_bb
 
         # 3. Enlace: Desenquadramento
         bits_desenquadrados = self._aplicar_enquadramento_rx(bits_brutos)
         
         # 4. Enlace: Verificação de Erros
-        bits_finais, status = self._aplicar_controle_erro_rx(bits_desenquadrados)
-        
-        # 5. Aplicação: Bits -> Texto
-        texto = self._bits_para_texto(bits_finais)
-        print(f"[RX] Texto Final: {texto} ({status})")
-        
-        if self.callback_rx:
-            self.callback_rx(texto, status)
+        return self._aplicar_controle_erro_rx(bits_desenquadrados)
 
     # ---------------- MÉTODOS AUXILIARES ----------------
     
-    def _texto_para_bits(self, texto: str) -> list[int]:
-        bits = []
-        for char in texto:
-            bin_val = format(ord(char), '08b')
-            bits.extend([int(b) for b in bin_val])
-        return bits
+    def _segmentar(self, bits: BitBuffer) -> list[BitBuffer]:
+        # pedaços de até MTU bytes; uma mensagem vazia ainda gera um quadro (vazio)
+        tamanho = 8 * self.mtu
+        return [bits[i:i + tamanho] for i in range(0, len(bits), tamanho)] or [bits]
+
+    def _resumir_status(self, status_quadros: list[str]) -> str:
+        # um quadro: o status dele; vários: o primeiro erro (e quantos quadros falharam) ou o status do primeiro
+        if len(status_quadros) == 1:
+            return status_quadros[0]
+        erros = [status for status in status_quadros if status.startswith("Erro")]
+        if erros:
+            return f"{erros[0]} ({len(erros)} de {len(status_quadros)} quadros)"
+        return f"{status_quadros[0]} ({len(status_quadros)} quadros)"
 
-    def _bits_para_texto(self, bits: list[int]) -> str:
-        chars = []
-        for i in range(0, len(bits), 8):
-            byte = bits[i:i+8]
-            if len(byte) < 8: break
-            str_byte = "".join(str(b) for b in byte)
-            chars.append(chr(int(str_byte, 2)))
-        return "".join(chars)
+    def _texto_para_bits(self, texto: str) -> BitBuffer:
+        # um byte por caractere; acima de 255 o caractere ocupa os bits que precisar (como format(ord, '08b'))
+        try:
+            return BitBuffer.de_bytes(texto.encode('latin-1'))
+        except UnicodeEncodeError:
+            return BitBuffer("".join(format(ord(char), '08b') for char in texto))
 
-    def _aplicar_enquadramento_tx(self, bits: list[int]) -> list[int]:
+    def _bits_para_texto(self, bits: BitBuffer | list[int]) -> str:
+        # cada byte completo vira o caractere de mesmo código (o byte incompleto no final é descartado)
+        bits = como_buffer(bits)
+        return bits[:len(bits) // 8 * 8].para_bytes().decode('latin-1')
+
+    def _aplicar_enquadramento_tx(self, bits: BitBuffer) -> BitBuffer:
         tipo = self.tipo_enquadramento.upper()
         if tipo.startswith("CONTAGEM"):
-            return camada_enlace.enquadrar_contagem_de_caracteres(bits)
+            return camada_enlace.enquadrar_contagem_de_caracteres(bits, self.bytes_cabecalho)
         elif "BYTE" in tipo:
             return camada_enlace.enquadrar_insercao_de_bytes(bits)
         elif "BIT" in tipo:
             return camada_enlace.enquadrar_insercao_de_bits(bits)
         return bits 
 
-    def _aplicar_enquadramento_rx(self, bits: list[int]) -> list[int]:
+    def _aplicar_enquadramento_rx(self, bits: BitBuffer) -> BitBuffer:
         tipo = self.tipo_enquadramento.upper()
         if tipo.startswith("CONTAGEM"):
-            return camada_enlace.desenquadrar_contagem_de_caracteres(bits)
+            return camada_enlace.desenquadrar_contagem_de_caracteres(bits, self.bytes_cabecalho)
         elif "BYTE" in tipo:
             return camada_enlace.desenquadrar_insercao_de_bytes(bits)
         elif "BIT" in tipo:
             return camada_enlace.desenquadrar_insercao_de_bits(bits)
         return bits
 
-    def _aplicar_controle_erro_tx(self, bits: list[int]) -> list[int]:
+    def _aplicar_controle_erro_tx(self, bits: BitBuffer) -> BitBuffer:
         tipo = self.tipo_erro.upper()
         if "PARIDADE" in tipo:
             return camada_enlace.adicionar_paridade_par(bits)
         elif "CHECKSUM" in tipo:
             return camada_enlace.adicionar_checksum(bits)
         elif "CRC" in tipo:
-            return camada_enlace.adicionar_crc(bits)
+            return camada_enlace.adicionar_crc(bits, "IEEE" if "IEEE" in tipo else "DIVISAO")
+        elif tipo.startswith("HAMMING ("):
+            return camada_enlace.obter_codigo_hamming(tipo).codificar(bits)
         elif "HAMMING" in tipo:
             return camada_enlace.adicionar_hamming(bits)
         return bits
 
-    def _aplicar_controle_erro_rx(self, bits: list[int]) -> tuple[list[int], str]:
+    def _aplicar_controle_erro_rx(self, bits: BitBuffer) -> tuple[BitBuffer, str, int]:
+        # retorna os dados, o status e quantos bits foram corrigidos
         tipo = self.tipo_erro.upper()
         if "PARIDADE" in tipo:
             ok = camada_enlace.verificar_paridade_par(bits)
-            return bits[:-1], ("Sucesso" if ok else "Erro Paridade")
+            return bits[:-1], ("Sucesso" if ok else "Erro Paridade"), 0
         elif "CHECKSUM" in tipo:
             ok = camada_enlace.verificar_checksum(bits)
-            return bits[:-16], ("Sucesso" if ok else "Erro Checksum")
+            return bits[:-16], ("Sucesso" if ok else "Erro Checksum"), 0
         elif "CRC" in tipo:
-            ok = camada_enlace.verificar_crc(bits)
-            return bits[:-32], ("Sucesso" if ok else "Erro CRC")
+            ok = camada_enlace.verificar_crc(bits, "IEEE" if "IEEE" in tipo else "DIVISAO")
+            return bits[:-32], ("Sucesso" if ok else "Erro CRC"), 0
+        elif tipo.startswith("HAMMING ("):
+            # Hamming em blocos: cada bloco corrige o seu erro (os dados são bytes; o resto é preenchimento do quadro)
+            dados, corrigidos, incorrigiveis = camada_enlace.obter_codigo_hamming(tipo).decodificar(bits, 8)
+            if incorrigiveis:
+                return dados, f"Erro Hamming ({incorrigiveis} bloco(s) sem correção)", corrigidos
+            return dados, (f"Hamming OK ({corrigidos} bloco(s) corrigido(s))" if corrigidos else "Hamming OK"), corrigidos
         elif "HAMMING" in tipo:
-            dados = camada_enlace.decodificar_hamming(list(bits)) 
-            return dados, "Hamming OK"
-        return bits, "Sem Verificação"
+            dados, corrigidos = camada_enlace.corrigir_hamming(BitBuffer(bits)) 
+            return dados, "Hamming OK", corrigidos
+        return bits, "Sem Verificação", 0
 
-    def _aplicar_ruido(self, sinal: list[float]) -> list[float]:
+    def _aplicar_ruido(self, sinal: np.ndarray) -> np.ndarray:
         sigma = self.snr_ruido
         if sigma <= 0: return sinal
-        return [x + random.gauss(0.0, sigma) for x in sinal]
\ No newline at end of file
+        if self.usa_portadora and self.modo_iq:
+            return camada_fisica.adicionar_ruido_iq(sinal, sigma, self.modem, self.rng, self.parametros)
+        # ruído gerado direto no tipo das amostras (float32 não é promovido a float64)
+        return sinal + sigma * self.rng.standard_normal(len(sinal), dtype=self.parametros.dtype)
+
+class EnlaceSimulado:
+    """
+    Um Simulador rodando sobre o escalonador de eventos discretos (eventos.py): o tempo é o relógio virtual,
+    não o real. Cada quadro ocupa o meio pelo tempo de transmissão (taxa_bits e amostras do sinal) e os
+    quadros de todas as mensagens saem um depois do outro; a chegada ao RX (fim da transmissão mais o atraso de
+    propagação) e o timeout de cada mensagem são eventos. A simulação roda tão rápido quanto a CPU permite e
+    as latências e a vazão são as do tempo simulado.
+    """
+
+    def __init__(self, simulador: Simulador, escalonador):
+        self.simulador = simulador
+        self.escalonador = escalonador
+        self.livre_em = escalonador.agora   # instante em que o meio termina o quadro em transmissão
+        self.tempo_ocupado = 0.0            # soma dos tempos de transmissão
+        self._esperando_meio = collections.deque()  # mensagens com quadros a transmitir, em ordem de envio
+        self.resultados = []                # mensagens entregues, na ordem de entrega
+        self.expiradas = 0                  # mensagens cujo timeout venceu antes da entrega
+
+    def enviar(self, mensagem_texto: str, atraso: float = 0.0, timeout: float = None) -> Future:
+        """
+        Agenda o envio da mensagem para daqui a atraso segundos simulados e retorna um Future com o
+        ResultadoTransmissao (com enviado_em e entregue_em), resolvido quando escalonador.executar() chegar à
+        entrega. Com timeout, se a mensagem não for entregue em timeout segundos após o envio, o Future recebe
+        um TimeoutError. Usa a configuração do simulador no momento desta chamada.
+        """
+        mensagem = _Mensagem(mensagem_texto, copy.copy(self.simulador))
+        self.escalonador.agendar(atraso, self._transmitir, mensagem, timeout)
+        return mensagem.futuro
+
+    # vazão em bits de dados entregues por segundo simulado (do primeiro envio à última entrega)
+    @property
+    def vazao(self) -> float:
+        if not self.resultados:
+            return 0.0
+        duracao = self.resultados[-1].entregue_em - min(resultado.enviado_em for resultado in self.resultados)
+        return sum(len(resultado.bits) for resultado in self.resultados) / duracao if duracao else 0.0
+
+    @property
+    def latencia_media(self) -> float:
+        return sum(r.latencia for r in self.resultados) / len(self.resultados) if self.resultados else 0.0
+
+    # fração do tempo simulado em que o meio esteve transmitindo
+    @property
+    def ocupacao(self) -> float:
+        return self.tempo_ocupado / self.escalonador.agora if self.escalonador.agora else 0.0
+
+    def _transmitir(self, mensagem: _Mensagem, timeout: float):
+        # uma mensagem cujo Future foi cancelado antes do envio não ocupa o meio
+        if not mensagem.futuro.set_running_or_notify_cancel():
+            return
+        escalonador = self.escalonador
+        mensagem.enviado_em = escalonador.agora
+        if timeout is not None:
+            mensagem.evento_timeout = escalonador.agendar(timeout, self._expirar, mensagem)
+        # os quadros são gerados um de cada vez, quando o meio fica livre para eles: na memória ficam só os
+        # sinais dos quadros em trânsito, não a mensagem inteira
+        mensagem.sinais = mensagem.configuracao._sinais_da_mensagem(mensagem.texto)
+        self._esperando_meio.append(mensagem)
+        if len(self._esperando_meio) == 1:
+            self._meio_livre()
+
+    def _meio_livre(self):
+        # o meio terminou o quadro anterior (ou estava ocioso): transmite o próximo quadro da primeira mensagem
+        # da fila; o quadro chega ao RX depois do tempo de transmissão e da propagação
+        escalonador = self.escalonador
+        while self._esperando_meio:
+            mensagem = self._esperando_meio[0]
+            config = mensagem.configuracao
+            try:
+                sinal = next(mensagem.sinais, None)
+            except Exception as erro:
+                mensagem.erro = erro
+                sinal = None
+            if sinal is None:
+                self._esperando_meio.popleft()
+                mensagem.sinais = None
+                if mensagem.erro is not None:
+                    self._entregar(mensagem)
+                else:
+                    # fim da mensagem: entregue junto com a chegada do último quadro (agendada antes)
+                    escalonador.agendar(config.atraso_propagacao, self._entregar, mensagem)
+                continue
+            duracao = config._tempo_de_transmissao(sinal)
+            self.livre_em = escalonador.agora + duracao
+            self.tempo_ocupado += duracao
+            escalonador.agendar_em(self.livre_em + config.atraso_propagacao, self._chegada, mensagem, sinal)
+            escalonador.agendar_em(self.livre_em, self._meio_livre)
+            return
+
+    def _chegada(self, mensagem: _Mensagem, sinal: np.ndarray):
+        if mensagem.futuro.done():
+            return  # expirou ou falhou
+        try:
+            bits, status, corrigidos = mensagem.configuracao._receber_quadro(sinal, registrar=not mensagem.quadros)
+        except Exception as erro:
+            mensagem.erro = erro
+            self._entregar(mensagem)
+            return
+        mensagem.quadros.append(bits)
+        mensagem.status_quadros.append(status)
+        mensagem.bits_corrigidos += corrigidos
+
+    def _entregar(self, mensagem: _Mensagem):
+        if mensagem.futuro.done():
+            return  # expirou ou já falhou
+        if mensagem.evento_timeout is not None:
+            mensagem.evento_timeout.cancelar()
+        if mensagem.erro is not None:
+            mensagem.futuro.set_exception(mensagem.erro)
+            return
+        config = mensagem.configuracao
+        resultado = config._montar_resultado(mensagem.quadros, mensagem.status_quadros, mensagem.bits_corrigidos)
+        _copiar_sinais(config, resultado)
+        resultado.enviado_em, resultado.entregue_em = mensagem.enviado_em, self.escalonador.agora
+        self.resultados.append(resultado)
+        mensagem.futuro.set_result(resultado)
+
+    def _expirar(self, mensagem: _Mensagem):
+        if not mensagem.futuro.done():
+            self.expiradas += 1
+            mensagem.futuro.set_exception(TimeoutError(
+                f"Mensagem não entregue em {self.escalonador.agora - mensagem.enviado_em} s simulados"))
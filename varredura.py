@@ -0,0 +1,157 @@
+# imports necessários
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from buffer_bits import BitBuffer
+from simulador import Simulador
+
+# Varredura Monte Carlo de BER/FER: para cada configuração (modulação, enquadramento, controle de erro) e cada
+# nível de ruído, transmite N quadros de dados aleatórios pelo Simulador e conta os erros. Os quadros são divididos
+# em tarefas executadas num pool de processos; cada tarefa tem o seu gerador aleatório, derivado de uma única
+# semente (SeedSequence.spawn), então o resultado é reproduzível e não depende de quantos processos foram usados.
+# Não usa a interface gráfica.
+
+# Valores usados para o que uma configuração não informar (os mesmos nomes de Simulador.configurar)
+CONFIGURACAO_PADRAO = {
+    "mod_bb": "NRZ-POLAR",
+    "mod_portadora": "ASK",
+    "usa_portadora": True,
+    "enquadramento": "Contagem de Caracteres",
+    "erro": "Nenhum",
+}
+
+class PontoVarredura:
+    """Contagens de uma configuração num nível de ruído (somadas de todas as tarefas do ponto)."""
+
+    def __init__(self, configuracao: dict, ruido: float):
+        self.configuracao = configuracao
+        self.ruido = ruido
+        self.quadros = 0
+        self.bits = 0
+        self.erros_de_bit = 0
+        self.quadros_com_erro = 0      # dados entregues diferentes dos enviados
+        self.quadros_detectados = 0    # status de erro na recepção
+        self.bits_corrigidos = 0
+        self.segundos = 0.0            # tempo de processamento somado das tarefas
+
+    # soma as contagens de uma tarefa
+    def acumular(self, contagens: dict):
+        for nome, valor in contagens.items():
+            setattr(self, nome, getattr(self, nome) + valor)
+
+    @property
+    def ber(self) -> float:
+        return self.erros_de_bit / self.bits if self.bits else 0.0
+
+    @property
+    def fer(self) -> float:
+        return self.quadros_com_erro / self.quadros if self.quadros else 0.0
+
+    # quadros por segundo de um processo
+    @property
+    def quadros_por_segundo(self) -> float:
+        return self.quadros / self.segundos if self.segundos else 0.0
+
+    def como_dicionario(self) -> dict:
+        return {**self.configuracao, "ruido": self.ruido, "quadros": self.quadros, "bits": self.bits,
+                "erros_de_bit": self.erros_de_bit, "ber": self.ber, "quadros_com_erro": self.quadros_com_erro,
+                "fer": self.fer, "quadros_detectados": self.quadros_detectados,
+                "bits_corrigidos": self.bits_corrigidos, "quadros_por_segundo": self.quadros_por_segundo}
+
+    def __repr__(self):
+        return f"PontoVarredura(ruido={self.ruido}, ber={self.ber:.3e}, fer={self.fer:.3e}, quadros={self.quadros})"
+
+class ResultadoVarredura:
+    """Pontos da varredura (na ordem configuração x ruído), a semente usada e o tempo total."""
+
+    def __init__(self, pontos: list[PontoVarredura], semente: int, segundos: float):
+        self.pontos = pontos
+        self.semente = semente
+        self.segundos = segundos
+
+    # quadros por segundo de toda a varredura (todos os processos)
+    @property
+    def quadros_por_segundo(self) -> float:
+        return sum(ponto.quadros for ponto in self.pontos) / self.segundos if self.segundos else 0.0
+
+    def como_dicionarios(self) -> list[dict]:
+        return [ponto.como_dicionario() for ponto in self.pontos]
+
+    # tabela em texto, uma linha por ponto
+    def tabela(self) -> str:
+        linhas = [f"{'modulação':<22} {'enquadramento':<24} {'erro':<24} {'ruído':>6} {'BER':>10} {'FER':>10} "
+                  f"{'corrigidos':>10} {'quadros/s':>10}"]
+        for ponto in self.pontos:
+            c = ponto.configuracao
+            modulacao = f"{c['mod_bb']}/{c['mod_portadora'] if c['usa_portadora'] else 'Nenhuma'}"
+            linhas.append(f"{modulacao:<22} {c['enquadramento']:<24} {c['erro']:<24} {ponto.ruido:>6.2f} "
+                          f"{ponto.ber:>10.3e} {ponto.fer:>10.3e} {ponto.bits_corrigidos:>10} "
+                          f"{ponto.quadros_por_segundo:>10.1f}")
+        return "\n".join(linhas)
+
+    def __str__(self):
+        return self.tabela()
+
+def varrer(configuracoes: list[dict], ruidos: list[float], quadros_por_ponto: int = 1000, bytes_por_quadro: int = 32,
+           semente: int = None, processos: int = None, quadros_por_tarefa: int = 100) -> ResultadoVarredura:
+    """
+    Executa quadros_por_ponto quadros de bytes_por_quadro bytes aleatórios para cada configuração e cada ruído
+    (desvio padrão do ruído, como no slider da interface). Cada configuração é um dicionário com os argumentos de
+    Simulador.configurar (menos o ruído). processos=None usa todos os núcleos.
+    """
+    if quadros_por_ponto < 1 or bytes_por_quadro < 1 or quadros_por_tarefa < 1:
+        raise ValueError("Quadros por ponto, bytes por quadro e quadros por tarefa devem ser positivos")
+
+    sequencia = np.random.SeedSequence(semente)
+    configuracoes = [{**CONFIGURACAO_PADRAO, **configuracao} for configuracao in configuracoes]
+    pontos = [PontoVarredura(configuracao, ruido) for configuracao in configuracoes for ruido in ruidos]
+
+    # cada ponto vira tarefas de até quadros_por_tarefa quadros, cada uma com a sua semente
+    tarefas = []
+    for indice, _ in enumerate(pontos):
+        for inicio in range(0, quadros_por_ponto, quadros_por_tarefa):
+            tarefas.append((indice, min(quadros_por_tarefa, quadros_por_ponto - inicio)))
+    sementes = sequencia.spawn(len(tarefas))
+
+    inicio = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=processos or os.cpu_count()) as executor:
+        futuros = [executor.submit(_executar_tarefa, pontos[indice].configuracao, pontos[indice].ruido, n_quadros,
+                                   bytes_por_quadro, semente_tarefa)
+                   for (indice, n_quadros), semente_tarefa in zip(tarefas, sementes)]
+        for (indice, _), futuro in zip(tarefas, futuros):
+            pontos[indice].acumular(futuro.result())
+
+    return ResultadoVarredura(pontos, sequencia.entropy, time.perf_counter() - inicio)
+
+# bits diferentes entre o que foi enviado e o que foi entregue; bits que faltam ou sobram também contam como errados
+def contar_erros_de_bit(enviados: BitBuffer, recebidos: BitBuffer) -> int:
+    enviados, recebidos = enviados.para_array(), recebidos.para_array()
+    comum = min(len(enviados), len(recebidos))
+    return int(np.count_nonzero(enviados[:comum] != recebidos[:comum])) + abs(len(enviados) - len(recebidos))
+
+# Executada em cada processo: transmite n_quadros mensagens de bytes aleatórios e retorna as contagens
+def _executar_tarefa(configuracao: dict, ruido: float, n_quadros: int, bytes_por_quadro: int,
+                     semente: np.random.SeedSequence) -> dict:
+    sim = Simulador()
+    # um quadro por mensagem: o MTU é o próprio tamanho do quadro
+    sim.configurar(ruido=ruido, **{"mtu": bytes_por_quadro, **configuracao})
+    sim.rng = np.random.default_rng(semente)
+
+    contagens = {"quadros": 0, "bits": 0, "erros_de_bit": 0, "quadros_com_erro": 0, "quadros_detectados": 0,
+                 "bits_corrigidos": 0}
+    inicio = time.perf_counter()
+    for _ in range(n_quadros):
+        dados = sim.rng.integers(0, 256, bytes_por_quadro, dtype=np.uint8).tobytes()
+        resultado = sim.simular(dados.decode('latin-1'))
+
+        erros = contar_erros_de_bit(BitBuffer.de_bytes(dados), resultado.bits)
+
+        contagens["quadros"] += 1
+        contagens["bits"] += 8 * bytes_por_quadro
+        contagens["erros_de_bit"] += erros
+        contagens["quadros_com_erro"] += int(erros > 0)
+        contagens["quadros_detectados"] += sum(status.startswith("Erro") for status in resultado.status_quadros)
+        contagens["bits_corrigidos"] += resultado.bits_corrigidos
+    contagens["segundos"] = time.perf_counter() - inicio
+    return contagens